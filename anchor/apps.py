@@ -3,7 +3,13 @@ import mimetypes
 from django.apps import AppConfig
 from django.core.checks import register
 
-from anchor.checks import test_storage_backends
+from anchor.checks import (
+    test_checksum_algorithm,
+    test_serve_mode,
+    test_signed_url_bucket,
+    test_signing_format,
+    test_storage_backends,
+)
 
 
 class AnchorConfig(AppConfig):
@@ -13,6 +19,15 @@ class AnchorConfig(AppConfig):
 
     def ready(self):
         register(test_storage_backends)
+        register(test_checksum_algorithm)
+        register(test_signing_format)
+        register(test_signed_url_bucket)
+        register(test_serve_mode)
+
+        # Register global variant presets so their digests are ready to use
+        from anchor.models.variation import Variation
+
+        Variation.global_presets()
 
         # add mime type detection for webp
         if "image/webp" not in mimetypes.types_map:
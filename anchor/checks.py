@@ -1,4 +1,4 @@
-from django.core.checks import Warning
+from django.core.checks import Error, Warning
 
 
 def test_storage_backends(app_configs, **kwargs):
@@ -18,3 +18,102 @@ def test_storage_backends(app_configs, **kwargs):
                 )
 
     return errors
+
+
+def test_checksum_algorithm(app_configs, **kwargs):
+    from django.core.exceptions import ImproperlyConfigured
+
+    from anchor.settings import anchor_settings
+    from anchor.support.checksums import get_hasher
+
+    try:
+        get_hasher(anchor_settings.CHECKSUM_ALGORITHM)
+    except ImproperlyConfigured as e:
+        return [
+            Error(
+                str(e),
+                hint="Check the CHECKSUM_ALGORITHM in your ANCHOR settings",
+                id="anchor.E001",
+            )
+        ]
+
+    if (
+        anchor_settings.DEDUPLICATE_BLOBS
+        and anchor_settings.CHECKSUM_ALGORITHM == "md5"
+    ):
+        return [
+            Warning(
+                "Deduplicating blobs by their MD5 checksum is not recommended, "
+                "since MD5 collisions can be crafted",
+                hint="Set CHECKSUM_ALGORITHM to 'sha256' or 'blake2b' in your "
+                "ANCHOR settings",
+                id="anchor.W002",
+            )
+        ]
+
+    return []
+
+
+def test_signing_format(app_configs, **kwargs):
+    from django.core.exceptions import ImproperlyConfigured
+
+    from anchor.settings import anchor_settings
+    from anchor.support.signing import FORMATS, get_signer
+
+    errors = []
+    if anchor_settings.SIGNING_FORMAT not in FORMATS:
+        errors.append(
+            Error(
+                f'Unsupported signing format "{anchor_settings.SIGNING_FORMAT}"',
+                hint=f"Set SIGNING_FORMAT to one of: {', '.join(FORMATS)}",
+                id="anchor.E002",
+            )
+        )
+
+    try:
+        get_signer().compact_signature_size
+    except ImproperlyConfigured as e:
+        errors.append(
+            Error(
+                str(e),
+                hint="Check the COMPACT_SIGNATURE_SIZE in your ANCHOR settings",
+                id="anchor.E003",
+            )
+        )
+
+    return errors
+
+
+def test_serve_mode(app_configs, **kwargs):
+    from anchor.settings import anchor_settings
+    from anchor.views.mixins import SERVE_MODES
+
+    if anchor_settings.SERVE_MODE not in SERVE_MODES:
+        return [
+            Error(
+                f'Unsupported serve mode "{anchor_settings.SERVE_MODE}"',
+                hint=f"Set SERVE_MODE to one of: {', '.join(SERVE_MODES)}",
+                id="anchor.E004",
+            )
+        ]
+
+    return []
+
+
+def test_signed_url_bucket(app_configs, **kwargs):
+    from datetime import timedelta
+
+    from anchor.settings import anchor_settings
+
+    bucket = anchor_settings.SIGNED_URL_BUCKET
+    if bucket and bucket < timedelta(seconds=1):
+        return [
+            Error(
+                "SIGNED_URL_BUCKET must be at least one second",
+                hint="Set SIGNED_URL_BUCKET to a longer duration, e.g. "
+                "timedelta(minutes=5), or to None to disable it",
+                id="anchor.E005",
+            )
+        ]
+
+    return []
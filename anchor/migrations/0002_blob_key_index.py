@@ -0,0 +1,16 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("anchor", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="blob",
+            index=models.Index(fields=["key"], name="ix_anchor_blobs_key"),
+        ),
+    ]
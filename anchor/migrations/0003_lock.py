@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:50
+
+import django.utils.timezone
+from django.db import migrations, models
+
+import anchor.models.base
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("anchor", "0002_blob_key_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Lock",
+            fields=[
+                (
+                    "id",
+                    models.CharField(
+                        default=anchor.models.base.generate_pk,
+                        editable=False,
+                        max_length=22,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="created at"
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(max_length=255, unique=True, verbose_name="name"),
+                ),
+                ("expires_at", models.DateTimeField(verbose_name="expires at")),
+            ],
+            options={
+                "verbose_name": "lock",
+                "verbose_name_plural": "locks",
+            },
+        ),
+    ]
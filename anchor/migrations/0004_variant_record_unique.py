@@ -0,0 +1,76 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:18
+
+from django.db import migrations, models
+
+
+def remove_duplicate_variant_records(apps, schema_editor):
+    """
+    Keeps the latest record of each variant, along with its image, and deletes
+    the others so that the unique constraint can be added.
+
+    Images of variants are all stored under the key of the variant, so only the
+    rows are deleted, not the files.
+    """
+    Attachment = apps.get_model("anchor", "Attachment")
+    Blob = apps.get_model("anchor", "Blob")
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    VariantRecord = apps.get_model("anchor", "VariantRecord")
+    db = schema_editor.connection.alias
+
+    duplicates = (
+        VariantRecord.objects.using(db)
+        .values("blob_id", "variation_digest")
+        .annotate(count=models.Count("id"))
+        .filter(count__gt=1)
+    )
+    stale = []
+    for duplicate in duplicates:
+        records = VariantRecord.objects.using(db).filter(
+            blob_id=duplicate["blob_id"],
+            variation_digest=duplicate["variation_digest"],
+        )
+        stale.extend(
+            records.order_by("-created_at", "-id").values_list("id", flat=True)[1:]
+        )
+    if not stale:
+        return
+
+    content_type = (
+        ContentType.objects.using(db)
+        .filter(app_label="anchor", model="variantrecord")
+        .first()
+    )
+    if content_type is not None:
+        attachments = Attachment.objects.using(db).filter(
+            content_type=content_type, object_id__in=stale
+        )
+        image_ids = list(attachments.values_list("blob_id", flat=True))
+        attachments.delete()
+        Blob.objects.using(db).filter(
+            pk__in=image_ids, attachments__isnull=True
+        ).delete()
+
+    VariantRecord.objects.using(db).filter(pk__in=stale).delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("anchor", "0003_lock"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            remove_duplicate_variant_records, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name="variantrecord",
+            constraint=models.UniqueConstraint(
+                fields=("blob", "variation_digest"),
+                name="unique_variant_record_per_blob_and_variation_digest",
+            ),
+        ),
+        migrations.RemoveIndex(
+            model_name="variantrecord",
+            name="ix_anchor_records_blob_digest",
+        ),
+    ]
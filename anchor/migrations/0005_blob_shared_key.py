@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("anchor", "0004_variant_record_unique"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="blob",
+            name="shared_key",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                default=None,
+                editable=False,
+                max_length=256,
+                null=True,
+                verbose_name="shared key",
+            ),
+        ),
+    ]
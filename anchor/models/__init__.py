@@ -1,7 +1,15 @@
 from .attachment import Attachment
 from .blob.blob import Blob
 from .fields import SingleAttachmentField
+from .lock import Lock
 from .variant import Variant
 from .variant_record import VariantRecord
 
-__all__ = ["Blob", "Attachment", "SingleAttachmentField", "Variant", "VariantRecord"]
+__all__ = [
+    "Blob",
+    "Attachment",
+    "Lock",
+    "SingleAttachmentField",
+    "Variant",
+    "VariantRecord",
+]
@@ -1,9 +1,12 @@
 from typing import Any
 
 from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import FieldDoesNotExist
 from django.db import models
 
 from anchor.models.base import BaseModel
+from anchor.models.variation import Variation
 
 
 class Attachment(BaseModel):
@@ -108,8 +111,29 @@ class Attachment(BaseModel):
         <anchor.models.blob.representations.RepresentationsMixin>` for full
         details.
         """
+        if isinstance(transformations, str) and transformations in self.presets:
+            transformations = Variation.from_preset(self.presets[transformations])
         return self.blob.representation(transformations)
 
+    @property
+    def presets(self) -> dict[str, str]:
+        """
+        The variant presets declared on the field holding this attachment, as a
+        mapping from preset names to their digests.
+        """
+        if self.content_type_id is None:
+            return {}
+
+        model = ContentType.objects.get_for_id(self.content_type_id).model_class()
+        if model is None:
+            return {}
+
+        try:
+            field = model._meta.get_field(self.name)
+        except FieldDoesNotExist:
+            return {}
+        return getattr(field, "variants", {})
+
     def purge(self):
         """
         Deletes the file from the storage backend.
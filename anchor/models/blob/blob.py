@@ -1,31 +1,137 @@
-import base64
-import hashlib
 import logging
 import mimetypes
 import os
-from typing import Any, Optional
+from typing import Any, Iterable, Optional
 
+from asgiref.sync import sync_to_async
 from django.core.files import File as DjangoFile
-from django.core.files.storage import Storage, storages
-from django.db import models
+from django.core.files.storage import Storage
+from django.db import models, transaction
+from django.urls import reverse
 from django.utils import timezone
 
 from anchor.models.base import BaseModel
 from anchor.services.urls import get_for_backend
 from anchor.settings import anchor_settings
-from anchor.support.signing import AnchorSigner
+from anchor.support.checksums import parse_checksum
+from anchor.support.ingest import IngestFile
+from anchor.support.signing import get_signer
+from anchor.support.storage import get_storage
 
+from .bulk import BulkCreateMixin
 from .keys import KeysMixin
 from .representations import RepresentationsMixin
 
 logger = logging.getLogger("anchor")
 
 
-class BlobQuerySet(models.QuerySet):
+class BlobQuerySet(BulkCreateMixin, models.QuerySet):
     def get_signed(self, signed_id: str, purpose: str = None):
         key = self.model.unsign_id(signed_id, purpose)
         return self.get(key=key)
 
+    async def aget_signed(self, signed_id: str, purpose: str = None):
+        """
+        Asynchronous version of :py:meth:`get_signed`.
+        """
+        key = self.model.unsign_id(signed_id, purpose)
+        return await self.aget(key=key)
+
+    def signed_ids(
+        self,
+        objs: Iterable[Any] = None,
+        purpose: str = None,
+        expires_in: timezone.timedelta = None,
+        expires_at: timezone.datetime = None,
+    ) -> list[str]:
+        """
+        Returns the signed IDs of many blobs at once.
+
+        ``objs`` can be any iterable of blobs or attachments and defaults to the
+        blobs in this queryset. All IDs are signed in one pass, with the same
+        expiration and purpose. Without a purpose or an expiration, they are
+        also attached to the blobs so that later calls to
+        :py:attr:`Blob.signed_id` (e.g. from the ``blob_url`` template tag)
+        return them without signing again.
+        """
+        blobs = self._blobs_from(objs)
+        signed_ids = self.model._get_signer().sign_many(
+            [blob.key for blob in blobs],
+            purpose=purpose,
+            expires_in=expires_in,
+            expires_at=expires_at,
+        )
+        if purpose is None and expires_in is None and expires_at is None:
+            for blob, signed_id in zip(blobs, signed_ids):
+                blob._signed_id = (blob.key, signed_id)
+
+        return signed_ids
+
+    def urls_for(self, objs: Iterable[Any] = None, **kwargs) -> list[str]:
+        """
+        Returns signed URLs to the blob redirect view for many blobs or
+        attachments at once, like the ``blob_url`` template tag does for a
+        single one.
+
+        Keyword arguments are passed to :py:meth:`signed_ids`.
+        """
+        blobs = self._blobs_from(objs)
+        signed_ids = self.signed_ids(blobs, **kwargs)
+        return [
+            reverse(
+                "anchor:blob",
+                kwargs={"signed_id": signed_id, "filename": blob.filename},
+            )
+            for blob, signed_id in zip(blobs, signed_ids)
+        ]
+
+    def prefetch_variants(self, *variations: Any, objs: Iterable[Any] = None):
+        """
+        Loads the variant records of many blobs or attachments at once, along
+        with their images, in two queries.
+
+        ``variations`` are anything accepted by :py:meth:`representation
+        <anchor.models.blob.representations.RepresentationsMixin.representation>`,
+        including preset names. ``objs`` can be any iterable of blobs or
+        attachments and defaults to the blobs in this queryset. Variants of
+        these blobs then know whether they are processed and return their
+        :py:meth:`image()
+        <anchor.models.variant_with_record.VariantWithRecord.image>` without
+        further queries. Returns the blobs.
+        """
+        from anchor.models.variant_record import VariantRecord
+
+        objs = list(self if objs is None else objs)
+        wanted = []
+        for obj in objs:
+            blob = obj if isinstance(obj, self.model) else obj.blob
+            if blob is None or not blob.is_variable:
+                continue
+            for variation in variations:
+                variant = obj.representation(variation)
+                wanted.append((blob, variant.variation.digest))
+
+        if wanted:
+            records = {
+                (record.blob_id, record.variation_digest): record
+                for record in VariantRecord.objects.filter(
+                    blob__in={blob.pk for blob, _ in wanted},
+                    variation_digest__in={digest for _, digest in wanted},
+                ).prefetch_related("image")
+            }
+            for blob, digest in wanted:
+                blob.__dict__.setdefault("_variant_records", {})[digest] = records.get(
+                    (blob.pk, digest)
+                )
+
+        return self._blobs_from(objs)
+
+    def _blobs_from(self, objs: Iterable[Any] = None) -> list["Blob"]:
+        return [
+            obj if isinstance(obj, self.model) else obj.blob
+            for obj in (self if objs is None else objs)
+        ]
+
     def unattached(self):
         """
         Returns all blobs that are not attached to any model.
@@ -37,12 +143,82 @@ class BlobQuerySet(models.QuerySet):
         return self.filter(attachments__isnull=True)
 
     def create(self, file: Optional[DjangoFile] = None, **kwargs):
-        blob = super().create(**kwargs)
+        """
+        Creates a blob, uploading the given file first if there is one.
+
+        The blob row is inserted with a single query once the file has been
+        uploaded and its metadata extracted. If the insert fails, the uploaded
+        file is deleted again.
+        """
+        # Deduplication needs to read the file twice, which requires seeking
+        if (
+            file
+            and anchor_settings.DEDUPLICATE_BLOBS
+            and getattr(file, "seekable", lambda: False)()
+        ):
+            return self.create_deduplicated(file, **kwargs)
+
+        blob = self.model(**kwargs)
         if file:
             blob.upload(file)
-        blob.save()
+        self._insert_uploaded(blob, uploaded=bool(file))
         return blob
 
+    async def acreate(self, file: Optional[DjangoFile] = None, **kwargs):
+        """
+        Asynchronous version of :py:meth:`create`.
+
+        Hashing and uploading the file run in a worker thread, so many blobs
+        can be created concurrently with ``asyncio.gather``. The row is inserted
+        like in :py:meth:`create`.
+        """
+        if (
+            file
+            and anchor_settings.DEDUPLICATE_BLOBS
+            and getattr(file, "seekable", lambda: False)()
+        ):
+            # Deduplication needs a transaction, which the async ORM lacks
+            return await sync_to_async(self.create_deduplicated)(file, **kwargs)
+
+        blob = self.model(**kwargs)
+        if file:
+            await blob.aupload(file)
+        await sync_to_async(self._insert_uploaded)(blob, uploaded=bool(file))
+        return blob
+
+    def create_deduplicated(self, file: DjangoFile, **kwargs):
+        """
+        Creates a blob for the given file, reusing the file stored for an
+        existing blob with the same checksum and size if there is one.
+
+        The file is hashed before uploading it, so files which have been stored
+        before are never uploaded again. Deduplicated blobs keep their own
+        ``key`` and point to the shared file with :py:attr:`Blob.shared_key`.
+        The file is only deleted from the storage backend when the last of them
+        is purged.
+        """
+        with transaction.atomic(using=self.db):
+            blob = self.model(**kwargs)
+            file = blob.ingest(file)
+            blob.unfurl(file)
+            duplicate = blob.find_duplicate(lock=True)
+            if duplicate is not None:
+                blob.shared_key = duplicate.storage_key
+            else:
+                blob.upload(file)
+            self._insert_uploaded(blob, uploaded=duplicate is None)
+        return blob
+
+    def _insert_uploaded(self, blob: "Blob", uploaded: bool) -> None:
+        self._for_write = True
+        try:
+            blob.save(force_insert=True, using=self.db)
+        except Exception:
+            # Don't leave orphaned files behind
+            if uploaded:
+                blob.storage.delete(blob.storage_key)
+            raise
+
     def from_path(self, path: str, **kwargs):
         with open(path, "rb") as f:
             return self.create(file=f, **kwargs)
@@ -58,6 +234,7 @@ class Blob(KeysMixin, RepresentationsMixin, BaseModel):
     class Meta:
         verbose_name = "blob"
         verbose_name_plural = "blobs"
+        indexes = (models.Index(fields=["key"], name="ix_anchor_blobs_key"),)
 
     objects = BlobQuerySet.as_manager()
 
@@ -68,6 +245,24 @@ class Blob(KeysMixin, RepresentationsMixin, BaseModel):
     A pointer to the file that the storage backend can understand. For instance
     in file-system backends, this is a path to the file, relative to the
     ``MEDIA_ROOT``.
+
+    Keys identify blobs in signed IDs and variants, so each blob has its own,
+    even when its file is shared with another blob. See :py:attr:`shared_key`.
+    """
+
+    shared_key = models.CharField(
+        max_length=256,
+        null=True,
+        blank=True,
+        default=None,
+        db_index=True,
+        editable=False,
+        verbose_name="shared key",
+    )
+    """
+    The key of the file stored for an earlier blob with the same content, when
+    this blob was deduplicated with the ``DEDUPLICATE_BLOBS`` setting. ``None``
+    when the blob has a file of its own.
     """
 
     filename = models.CharField(
@@ -125,7 +320,11 @@ class Blob(KeysMixin, RepresentationsMixin, BaseModel):
         editable=False,
     )
     """
-    The MD5 checksum of the file.
+    The checksum of the file, computed with the ``CHECKSUM_ALGORITHM`` setting.
+
+    Checksums are URL-safe base64-encoded digests prefixed with the name of the
+    algorithm, except for MD5 checksums which have no prefix. See
+    :py:mod:`anchor.support.checksums`.
     """
 
     metadata = models.JSONField(
@@ -151,8 +350,14 @@ class Blob(KeysMixin, RepresentationsMixin, BaseModel):
     def signed_id(self):
         """
         A signed ID of the Blob, used to generate URLs.
+
+        It is computed once per instance, unless it has been attached in bulk
+        with :py:meth:`BlobQuerySet.signed_ids`.
         """
-        return self.get_signed_id()
+        cached = self.__dict__.get("_signed_id")
+        if cached is None or cached[0] != self.key:
+            cached = self._signed_id = (self.key, self.get_signed_id())
+        return cached[1]
 
     def get_signed_id(
         self,
@@ -205,22 +410,43 @@ class Blob(KeysMixin, RepresentationsMixin, BaseModel):
 
     @classmethod
     def _get_signer(cls):
-        return AnchorSigner()
+        return get_signer()
 
     def __str__(self):
         return self.filename or self.id
 
-    def upload(self, file: DjangoFile):
+    def upload(self, file: DjangoFile | Any):
+        """
+        Saves the given file to the storage backend and extracts its metadata.
+
+        The file is read only once: its checksum, size and MIME type are
+        calculated while the storage backend consumes it, in chunks of
+        ``UPLOAD_CHUNK_SIZE`` bytes.
+        """
+        file = self.ingest(file)
+        self.storage.save(self.storage_key, file)
         self.unfurl(file)
-        self.storage.save(self.key, file)
+
+    async def aupload(self, file: DjangoFile | Any):
+        """
+        Asynchronous version of :py:meth:`upload`.
+
+        Reading, hashing and saving the file happen in a worker thread.
+        """
+        await sync_to_async(self.upload, thread_sensitive=False)(file)
 
     def unfurl(self, file: DjangoFile | Any):
-        if not isinstance(file, DjangoFile):
-            file = DjangoFile(file)
+        """
+        Populates the MIME type, size, checksum and filename of this blob from
+        the given file.
+        """
+        if not isinstance(file, IngestFile):
+            file = self.ingest(file)
+        file.finish()
 
         self.mime_type = self.guess_mime_type(file)
-        self.byte_size = file.size
-        self.checksum = self.calculate_checksum(file)
+        self.byte_size = file.byte_size
+        self.checksum = file.checksum
         try:
             if file.name:
                 self.filename = self.storage.get_valid_name(os.path.basename(file.name))
@@ -229,44 +455,101 @@ class Blob(KeysMixin, RepresentationsMixin, BaseModel):
         except TypeError:  # pragma: no cover
             self.filename = None
 
+    def ingest(self, file: DjangoFile | Any) -> IngestFile:
+        """
+        Wraps the given file so that its metadata is computed as it is read.
+        """
+        if isinstance(file, IngestFile):
+            return file
+
+        return IngestFile(
+            file,
+            chunk_size=anchor_settings.UPLOAD_CHUNK_SIZE,
+            algorithm=anchor_settings.CHECKSUM_ALGORITHM,
+        )
+
     def guess_mime_type(self, file: DjangoFile):
         """
         Guesses the MIME type of the given file from its name.
 
-        If the file name is not available, returns the default MIME type.
+        If the file name is not available or has an unknown extension, the type
+        is sniffed from the first bytes of files that have been ingested. As a
+        last resort, returns the default MIME type.
         """
-        if file.name is None:
-            return anchor_settings.DEFAULT_MIME_TYPE
+        if file.name is not None:
+            mime, _ = mimetypes.guess_type(file.name)
+            if mime is not None:
+                return mime
 
-        mime, _ = mimetypes.guess_type(file.name)
-        if mime is not None:
-            return mime
-
-        return anchor_settings.DEFAULT_MIME_TYPE
+        return (
+            getattr(file, "sniffed_mime_type", None)
+            or anchor_settings.DEFAULT_MIME_TYPE
+        )
 
     def calculate_checksum(self, file: DjangoFile) -> str:
         """
-        Computes the MD5 hash of the given file and returns it as a (URL-safe)
-        base64-encoded string.
+        Computes the hash of the given file with the configured
+        ``CHECKSUM_ALGORITHM`` and returns it as a checksum string.
         """
-        m = hashlib.md5()
-        for c in file.chunks(chunk_size=1024):
-            if isinstance(c, str):
-                m.update(c.encode("utf-8"))
-            else:
-                m.update(c)
+        file = self.ingest(file)
+        file.finish()
+        return file.checksum
+
+    @property
+    def checksum_algorithm(self) -> str | None:
+        """
+        The name of the algorithm used to compute this blob's checksum.
+        """
+        if not self.checksum:
+            return None
+        return parse_checksum(self.checksum)[0]
 
-        return base64.urlsafe_b64encode(m.digest()).decode("utf-8")
+    def find_duplicate(self, lock: bool = False) -> Optional["Blob"]:
+        """
+        Returns another blob stored in the same backend with the same checksum
+        and size as this one, if any.
+
+        Images of variants are never returned: their files are deleted along
+        with the variant, regardless of the blobs referencing them.
+
+        Pass ``lock=True`` within a transaction to prevent the duplicate from
+        being purged before the transaction is committed.
+        """
+        if not self.checksum:
+            return None
+
+        duplicates = (
+            type(self)
+            .objects.filter(
+                backend=self.backend,
+                checksum=self.checksum,
+                byte_size=self.byte_size,
+            )
+            .exclude(pk=self.pk)
+            .exclude(key__startswith="variants/")
+        )
+        if lock:
+            duplicates = duplicates.select_for_update()
+        return duplicates.first()
+
+    @property
+    def storage_key(self) -> str:
+        """
+        The key of this blob's file in the storage backend: the
+        :py:attr:`shared_key` of deduplicated blobs, or the :py:attr:`key`.
+        """
+        return self.shared_key or self.key
 
     @property
     def storage(self) -> Storage:
         """
         The Django storage backend where the file is persisted.
 
-        Instantiated by looking up the configuration in ``settings`` for this
-        object's :py:attr:`backend`.
+        Instances are built from the configuration in ``settings`` for this
+        object's :py:attr:`backend` and shared between all blobs stored in the
+        same backend.
         """
-        return storages.create_storage(storages.backends[self.backend])
+        return get_storage(self.backend)
 
     def url(
         self,
@@ -288,7 +571,7 @@ class Blob(KeysMixin, RepresentationsMixin, BaseModel):
         value at the call site.
         """
         return self.url_service.url(
-            self.key,
+            self.storage_key,
             expires_in=expires_in,
             disposition=disposition,
             filename=filename if filename is not None else self.filename,
@@ -306,7 +589,16 @@ class Blob(KeysMixin, RepresentationsMixin, BaseModel):
         This method might involve a download if the storage backend is not
         local. It can be used as a context manager.
         """
-        return self.storage.open(self.key, mode)
+        return self.storage.open(self.storage_key, mode)
+
+    async def aopen(self, mode="rb"):
+        """
+        Asynchronous version of :py:meth:`open`.
+
+        Opening the file, which might involve a download, happens in a worker
+        thread. The returned file object is synchronous.
+        """
+        return await sync_to_async(self.open, thread_sensitive=False)(mode)
 
     @property
     def is_image(self):
@@ -317,10 +609,40 @@ class Blob(KeysMixin, RepresentationsMixin, BaseModel):
 
     def purge(self):
         """
-        Deletes the file from the storage backend.
+        Deletes the blob and its file from the storage backend.
+
+        Deduplicated blobs share their file with other blobs, so the file is
+        only deleted once no other blob references it.
+        """
+        if not self._delete_and_check_references():
+            self.storage.delete(self.storage_key)
+
+    async def apurge(self):
+        """
+        Asynchronous version of :py:meth:`purge`.
+        """
+        if not await sync_to_async(self._delete_and_check_references)():
+            await sync_to_async(self.storage.delete, thread_sensitive=False)(
+                self.storage_key
+            )
+
+    def _delete_and_check_references(self) -> bool:
+        """
+        Deletes this blob and returns whether other blobs still reference its
+        file.
         """
-        self.delete()
-        self.storage.delete(self.key)
+        storage_key = self.storage_key
+        with transaction.atomic():
+            self.delete()
+            return (
+                type(self)
+                .objects.filter(backend=self.backend)
+                .filter(
+                    models.Q(shared_key=storage_key)
+                    | models.Q(key=storage_key, shared_key__isnull=True)
+                )
+                .exists()
+            )
 
     @property
     def custom_metadata(self):
@@ -0,0 +1,164 @@
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Iterable
+
+from django.db import DatabaseError, transaction
+
+FileOrPath = Any
+
+
+@dataclass
+class BulkCreateResult:
+    """
+    The outcome of creating a blob for one of the files passed to
+    :py:meth:`BulkCreateMixin.bulk_create_from_files`.
+    """
+
+    source: FileOrPath
+    """
+    The path or file-like object the blob was created from.
+    """
+
+    blob: Any = None
+    """
+    The created blob, or ``None`` if creating it failed.
+    """
+
+    error: Exception | None = None
+    """
+    The exception raised while uploading the file or saving the blob, if any.
+    """
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+_DONE = object()
+
+
+class BulkCreateMixin:
+    """
+    Adds bulk creation of blobs to the
+    :py:class:`BlobQuerySet <anchor.models.blob.blob.BlobQuerySet>`.
+    """
+
+    def bulk_create_from_files(
+        self,
+        files: Iterable[FileOrPath],
+        workers: int = 4,
+        batch_size: int = 500,
+        **kwargs,
+    ) -> list[BulkCreateResult]:
+        """
+        Creates one blob for each of the given paths or file-like objects.
+
+        Files are hashed and uploaded by a pool of ``workers`` threads, which
+        hand their results to the calling thread through a bounded queue. Blob
+        rows are then inserted in batches of ``batch_size`` with a single query
+        per batch. Files are consumed lazily, so ``files`` can be a generator
+        over a very large collection.
+
+        Extra keyword arguments (e.g. ``backend``) are used to initialize every
+        blob. Blobs created in bulk are not deduplicated.
+
+        Returns a :py:class:`BulkCreateResult` per file, in the same order as
+        ``files``. Failing to upload a file or insert its row does not abort the
+        rest of the import: the exception is reported in the result instead.
+        """
+        if "key" in kwargs:
+            raise ValueError("Blobs created in bulk cannot share the same key.")
+
+        sources = enumerate(files)
+        sources_lock = threading.Lock()
+        results_queue = queue.Queue(maxsize=workers * 2)
+        stop = threading.Event()
+        iteration_errors = []
+
+        def next_source():
+            with sources_lock:
+                return next(sources, None)
+
+        def work():
+            try:
+                while not stop.is_set() and (item := next_source()) is not None:
+                    index, source = item
+                    results_queue.put((index, self._upload_for_bulk(source, kwargs)))
+            except Exception as e:
+                iteration_errors.append(e)
+            finally:
+                results_queue.put(_DONE)
+
+        results = {}
+        batch = []
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for _ in range(workers):
+                executor.submit(work)
+
+            running = workers
+            try:
+                while running:
+                    item = results_queue.get()
+                    if item is _DONE:
+                        running -= 1
+                        continue
+
+                    index, result = item
+                    results[index] = result
+                    if result.ok:
+                        batch.append(result)
+                    if len(batch) >= batch_size:
+                        self._insert_bulk_batch(batch)
+                        batch = []
+            except BaseException:
+                # Let the workers finish so that the executor can shut down
+                stop.set()
+                while running:
+                    if results_queue.get() is _DONE:
+                        running -= 1
+                raise
+
+        self._insert_bulk_batch(batch)
+        if iteration_errors:
+            raise iteration_errors[0]
+
+        return [results[index] for index in sorted(results)]
+
+    def _upload_for_bulk(
+        self, source: FileOrPath, kwargs: dict[str, Any]
+    ) -> BulkCreateResult:
+        blob = self.model(**kwargs)
+        try:
+            if isinstance(source, (str, os.PathLike)):
+                with open(source, "rb") as f:
+                    blob.upload(f)
+            else:
+                blob.upload(source)
+        except Exception as e:
+            return BulkCreateResult(source=source, error=e)
+
+        return BulkCreateResult(source=source, blob=blob)
+
+    def _insert_bulk_batch(self, batch: list[BulkCreateResult]) -> None:
+        if not batch:
+            return
+
+        try:
+            with transaction.atomic(using=self.db):
+                self.bulk_create([result.blob for result in batch])
+            return
+        except DatabaseError:
+            pass
+
+        # Insert rows one at a time to find out which ones are failing
+        for result in batch:
+            try:
+                with transaction.atomic(using=self.db):
+                    result.blob.save(force_insert=True, using=self.db)
+            except DatabaseError as e:
+                result.blob.storage.delete(result.blob.key)
+                result.blob = None
+                result.error = e
@@ -1,3 +1,4 @@
+from contextlib import ExitStack
 from typing import Any
 
 from anchor.models.variation import Variation
@@ -63,6 +64,54 @@ class RepresentationsMixin:
         variation.default_to(self.default_variant_transformations)
         return self.variant_class(self, variation)
 
+    def process_variants(self, variations: list[Any]) -> list[Any]:
+        """
+        Generates many variants of this image at once and returns them in the
+        same order.
+
+        The original file is downloaded and decoded only once, and every
+        variant that was not processed yet is derived from the decoded image.
+        ``variations`` may contain anything accepted by :py:meth:`variant`.
+
+        Like :py:attr:`Variant.processed
+        <anchor.models.variant.Variant.processed>`, this holds the locks of the
+        pending variants while generating them and honors the
+        ``VARIANT_FAILURE_CACHE``.
+        """
+        # Repeated variations share the same variant object
+        unique = {}
+        variants = [
+            unique.setdefault(variant.key, variant)
+            for variant in map(self.variant, variations)
+        ]
+        pending = [variant for variant in unique.values() if not variant.is_processed]
+        for variant in pending:
+            variant._check_failures()
+
+        with ExitStack() as stack:
+            # Lock in a consistent order so that concurrent batches don't wait
+            # on each other's locks
+            pending = [
+                variant
+                for variant in sorted(pending, key=lambda variant: variant.key)
+                if stack.enter_context(variant._claim())
+            ]
+            if not pending:
+                return variants
+
+            for variant in pending:
+                stack.enter_context(variant._recording_failures())
+            with (
+                self.open() as original,
+                Variation.transform_many(
+                    [variant.variation for variant in pending], original
+                ) as outputs,
+            ):
+                for variant, output in zip(pending, outputs):
+                    variant.upload(output)
+
+        return variants
+
     @property
     def is_variable(self) -> bool:
         return self.mime_type.startswith("image/")
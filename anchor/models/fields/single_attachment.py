@@ -2,13 +2,14 @@ from typing import Any, Callable
 
 from django.contrib.contenttypes.fields import GenericRel, GenericRelation
 from django.contrib.contenttypes.models import ContentType
-from django.db import models
+from django.db import models, transaction
 from django.db.models import Model
 from django.db.models.fields.related_descriptors import ReverseOneToOneDescriptor
 from django.utils.functional import cached_property
 from django.utils.text import capfirst
 
 from anchor.models import Attachment, Blob
+from anchor.models.variation import Variation
 
 
 class SingleAttachmentRel(GenericRel):
@@ -103,6 +104,7 @@ class ReverseSingleAttachmentDescriptor(ReverseOneToOneDescriptor):
             **self.related.field.get_forward_related_filter(instance),
             defaults={"blob": blob},
         )
+        self.related.field.schedule_eager_variants(blob)
 
     def get_queryset(self, **hints):
         return (
@@ -185,6 +187,27 @@ class SingleAttachmentField(GenericRelation):
         >>> movie.cover = uploaded_file  # Attach a file
         >>> movie.cover.url()  # Get URL to original file
         '/media/movie-covers/matrix-cover.jpg'
+
+    Named variant presets can be declared with the ``variants`` argument and
+    referenced by name when generating representations, e.g. with
+    ``{% representation_url movie.cover "thumb" %}``:
+
+        >>> cover = SingleAttachmentField(
+        ...     variants={
+        ...         "thumb": {"resize_to_fill": (100, 100)},
+        ...         "hero": {"resize_to_limit": (1600, 900), "format": "jpeg"},
+        ...     }
+        ... )
+
+    Variants listed in ``eager_variants``, either preset names or
+    transformation dictionaries, are generated as soon as a file is attached
+    and the transaction commits, using the executor configured in the
+    ``VARIANT_EXECUTOR`` setting:
+
+        >>> cover = SingleAttachmentField(
+        ...     variants={"thumb": {"resize_to_fill": (100, 100)}},
+        ...     eager_variants=["thumb"],
+        ... )
     """
 
     rel_class = SingleAttachmentRel
@@ -193,10 +216,22 @@ class SingleAttachmentField(GenericRelation):
         self,
         upload_to: str | Callable[[models.Model, Blob], str] = None,
         backend: str = None,
+        variants: dict[str, dict[str, Any]] = None,
+        eager_variants: list[str | dict[str, Any]] = None,
         **kwargs,
     ):
         self.upload_to = upload_to
         self.backend = backend
+        self.variants = {
+            name: Variation.register_preset(transformations)
+            for name, transformations in (variants or {}).items()
+        }
+        self.eager_variants = [
+            self.variants.get(variation, variation)
+            if isinstance(variation, str)
+            else Variation.register_preset(variation)
+            for variation in eager_variants or []
+        ]
         self.object_id_field_name = "object_id"
         self.content_type_field_name = "content_type"
         self.for_concrete_model = True
@@ -231,6 +266,24 @@ class SingleAttachmentField(GenericRelation):
             ),
         )
 
+    def schedule_eager_variants(self, blob: Blob) -> None:
+        """
+        Schedules the generation of this field's eager variants of the given
+        blob for when the current transaction commits.
+        """
+        if not self.eager_variants or not blob.is_variable:
+            return
+
+        from anchor.models.variant import process_variants
+        from anchor.services.executors import get_variant_executor
+
+        transaction.on_commit(
+            lambda: get_variant_executor().submit(
+                process_variants, blob.pk, list(self.eager_variants)
+            ),
+            using=blob._state.db,
+        )
+
     def formfield(self, **kwargs):
         from anchor.forms.fields import SingleAttachmentField
 
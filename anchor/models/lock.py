@@ -0,0 +1,24 @@
+from django.db import models
+
+from anchor.models.base import BaseModel
+
+
+class Lock(BaseModel):
+    """
+    A named lock held by :py:class:`DatabaseLock
+    <anchor.services.locks.DatabaseLock>`.
+    """
+
+    class Meta:
+        verbose_name = "lock"
+        verbose_name_plural = "locks"
+
+    name = models.CharField(max_length=255, unique=True, verbose_name="name")
+    """
+    The name of the lock, e.g. the storage key of the variant being generated.
+    """
+
+    expires_at = models.DateTimeField(verbose_name="expires at")
+    """
+    When the lock can be taken over, in case its holder never released it.
+    """
@@ -1,14 +1,36 @@
-import hashlib
+import os
+import time
 from contextlib import contextmanager
 from typing import Any, Self
 
+from django.core.cache import caches
+from django.core.files import File
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
 from anchor.models import Blob
 from anchor.models.variation import Variation
+from anchor.services.locks import get_variant_lock
+from anchor.services.transformers import TransformationError
 from anchor.services.urls import get_for_backend
-from anchor.support.base58 import b58encode
+from anchor.settings import anchor_settings
+from anchor.support.lru import LRUCache
+
+
+class RecentlyFailed(TransformationError):
+    """
+    Raised instead of processing a variant again while it is backing off after
+    a failure (see ``VARIANT_FAILURE_CACHE``).
+    """
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
 
 
 class Variant:
+    _processed_keys = LRUCache(maxsize=4096)
+
     def __init__(
         self, blob: Blob, variation_or_variation_key: Variation | str | dict[str, Any]
     ):
@@ -21,9 +43,16 @@ class Variant:
 
     @property
     def variation_key_digest(self) -> str:
-        m = hashlib.sha256()
-        m.update(self.variation.key.encode("utf-8"))
-        return b58encode(m.digest()).decode("utf-8")
+        return self.variation.key_digest
+
+    @property
+    def filename(self) -> str:
+        """
+        A file name for this variant: the name of the original file with the
+        extension of the variation's format.
+        """
+        stem = os.path.splitext(self.blob.filename or "")[0] or "variant"
+        return f"{stem}.{self.variation.format}"
 
     @property
     def storage(self) -> str:
@@ -38,6 +67,7 @@ class Variant:
 
     def delete(self) -> None:
         self.storage.delete(self.key)
+        self._forget_processed()
 
     @contextmanager
     def process(self):
@@ -45,17 +75,193 @@ class Variant:
             self.blob.open() as original,
             self.variation.transform(original) as transformed,
         ):
-            self.storage.save(self.key, transformed)
+            self.upload(transformed)
             transformed.seek(0)
             yield transformed
 
+    def upload(self, transformed) -> None:
+        """
+        Stores the result of applying the variation to the original file.
+
+        The storage backend reads the result straight from the buffer returned
+        by the transformer, which is in memory for small variants.
+        """
+        if not isinstance(transformed, File):
+            transformed = File(transformed, name=self.filename)
+        self.storage.save(self.key, transformed)
+        self._remember_processed()
+
     @property
     def is_processed(self) -> bool:
-        return self.storage.exists(self.key)
+        """
+        Whether the variant was generated already.
+
+        Processed keys are remembered in memory for
+        ``VARIANT_EXISTENCE_MAX_AGE`` and in the ``VARIANT_EXISTENCE_CACHE``, so
+        hot variants are found without asking the storage backend.
+        """
+        expires_at = self._processed_keys.get(self._existence_key)
+        if expires_at is not None and expires_at > time.monotonic():
+            return True
+
+        cache = _existence_cache()
+        if cache is not None and cache.get(self._existence_key):
+            self._remember_locally()
+            return True
+
+        if self.storage.exists(self.key):
+            self._remember_processed()
+            return True
+        return False
+
+    @property
+    def _existence_key(self) -> str:
+        return f"anchor:variant:{self.blob.backend}:{self.key}"
+
+    def _remember_processed(self) -> None:
+        self._remember_locally()
+        cache = _existence_cache()
+        if cache is not None:
+            cache.set(self._existence_key, True)
+
+    def _remember_locally(self) -> None:
+        max_age = anchor_settings.VARIANT_EXISTENCE_MAX_AGE.total_seconds()
+        if max_age > 0:
+            self._processed_keys.set(self._existence_key, time.monotonic() + max_age)
+
+    def _forget_processed(self) -> None:
+        self._processed_keys.delete(self._existence_key)
+        cache = _existence_cache()
+        if cache is not None:
+            cache.delete(self._existence_key)
+
+    def refresh(self) -> None:
+        """
+        Forgets what this object remembers about the processing state of the
+        variant, so that it is checked again.
+        """
 
     @property
     def processed(self) -> Self:
-        if not self.is_processed:
-            with self.process():
-                pass
+        """
+        Returns this variant after generating it if it was not processed yet.
+
+        When ``VARIANT_LOCK_BACKEND`` is set, concurrent callers wait for the
+        first one to generate the variant instead of generating it again.
+
+        When ``VARIANT_FAILURE_CACHE`` is set, a variant that failed to process
+        raises :py:class:`RecentlyFailed` until its backoff expires.
+        """
+        self._check_failures()
+        if self.is_processed:
+            return self
+
+        with self._claim() as pending, self._recording_failures():
+            if pending:
+                with self.process():
+                    pass
         return self
+
+    @contextmanager
+    def _claim(self):
+        """
+        Holds the lock of this unprocessed variant, if locking is enabled, and
+        yields whether it still needs to be processed.
+        """
+        lock = get_variant_lock()
+        if lock is None:
+            yield True
+            return
+
+        with lock.lock(self.key):
+            # Someone else may have generated it while we were waiting
+            self.refresh()
+            yield not self.is_processed
+
+    @contextmanager
+    def _recording_failures(self):
+        """
+        Remembers a failure to process this variant in the
+        ``VARIANT_FAILURE_CACHE``, or forgets previous ones on success.
+        """
+        cache = _failure_cache()
+        if cache is None:
+            yield
+            return
+
+        try:
+            yield
+        except TransformationError as e:
+            self._record_failure(cache, e)
+            raise
+        cache.delete(self._failure_key)
+
+    @property
+    def _failure_key(self) -> str:
+        return f"anchor:variant-failure:{self.key}"
+
+    def _check_failures(self) -> None:
+        cache = _failure_cache()
+        if cache is None:
+            return
+
+        failure = cache.get(self._failure_key)
+        if failure is None:
+            return
+
+        retry_after = failure["retry_at"] - time.time()
+        if retry_after > 0:
+            raise RecentlyFailed(failure["error"], retry_after=int(retry_after) + 1)
+
+    def _record_failure(self, cache, error: Exception) -> None:
+        failure = cache.get(self._failure_key)
+        failures = failure["failures"] + 1 if failure else 1
+        backoff = min(
+            anchor_settings.VARIANT_FAILURE_BACKOFF.total_seconds()
+            * 2 ** (failures - 1),
+            anchor_settings.VARIANT_FAILURE_MAX_BACKOFF.total_seconds(),
+        )
+        cache.set(
+            self._failure_key,
+            {
+                "failures": failures,
+                "retry_at": time.time() + backoff,
+                "error": str(error),
+            },
+            # Remember the failure count past the backoff to keep growing it
+            timeout=backoff
+            + anchor_settings.VARIANT_FAILURE_MAX_BACKOFF.total_seconds(),
+        )
+
+
+@receiver(setting_changed)
+def _clear_processed_keys_on_setting_changed(*, setting, **kwargs):
+    if setting in ("STORAGES", "ANCHOR"):
+        Variant._processed_keys.clear()
+
+
+def _existence_cache():
+    alias = anchor_settings.VARIANT_EXISTENCE_CACHE
+    return caches[alias] if alias else None
+
+
+def _failure_cache():
+    alias = anchor_settings.VARIANT_FAILURE_CACHE
+    return caches[alias] if alias else None
+
+
+def process_variants(blob_id: str, variations: list[str]) -> None:
+    """
+    Generates the given variants of a blob, unless they were already processed.
+
+    ``variations`` are strings accepted by :py:meth:`Variation.wrap
+    <anchor.models.variation.Variation.wrap>`, like variation keys or preset
+    digests. Arguments are plain strings so that this function can be sent to
+    an external task queue by an :py:mod:`executor
+    <anchor.services.executors>`.
+    """
+    blob = Blob.objects.filter(pk=blob_id).first()
+    if blob is None or not blob.is_variable:
+        return
+
+    blob.process_variants(variations)
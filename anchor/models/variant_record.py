@@ -8,10 +8,10 @@ class VariantRecord(BaseModel):
     class Meta:
         verbose_name = "variant record"
         verbose_name_plural = "variant records"
-        indexes = (
-            models.Index(
-                fields=["blob", "variation_digest"],
-                name="ix_anchor_records_blob_digest",
+        constraints = (
+            models.constraints.UniqueConstraint(
+                fields=("blob", "variation_digest"),
+                name="unique_variant_record_per_blob_and_variation_digest",
             ),
         )
 
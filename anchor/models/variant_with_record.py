@@ -1,13 +1,17 @@
-from contextlib import contextmanager
-
+from django.contrib.contenttypes.models import ContentType
 from django.core.files import File
+from django.db import IntegrityError, transaction
 
-from anchor.models import Blob
+from anchor.models import Attachment, Blob
 from anchor.models.variant import Variant
 from anchor.models.variant_record import VariantRecord
 
+_UNKNOWN = object()
+
 
 class VariantWithRecord(Variant):
+    _record = _UNKNOWN
+
     @property
     def is_processed(self) -> bool:
         return self.record is not None
@@ -18,28 +22,86 @@ class VariantWithRecord(Variant):
     def delete(self):
         if self.record:
             self.record.delete()
+        self._remember(None)
 
         super().delete()
 
+    def refresh(self) -> None:
+        self._record = _UNKNOWN
+        getattr(self.blob, "_variant_records", {}).pop(self.variation.digest, None)
+
     @property
     def record(self) -> VariantRecord:
-        return VariantRecord.objects.filter(
-            blob=self.blob, variation_digest=self.variation.digest
-        ).first()
+        """
+        The record of this variant, or ``None`` if it was not processed yet.
+
+        It is looked up once per variant, or not at all if it was loaded with
+        :py:meth:`Blob.objects.prefetch_variants()
+        <anchor.models.blob.blob.BlobQuerySet.prefetch_variants>`.
+        """
+        if self._record is _UNKNOWN:
+            prefetched = getattr(self.blob, "_variant_records", {})
+            digest = self.variation.digest
+            if digest in prefetched:
+                self._record = prefetched[digest]
+            else:
+                self._record = VariantRecord.objects.filter(
+                    blob=self.blob, variation_digest=digest
+                ).first()
+        return self._record
+
+    def _remember(self, record: VariantRecord | None) -> None:
+        self._record = record
+        prefetched = getattr(self.blob, "_variant_records", None)
+        if prefetched is not None:
+            prefetched[self.variation.digest] = record
 
     def get_or_create_record(self, image: File) -> VariantRecord:
-        record = VariantRecord.objects.get_or_create(
-            blob=self.blob, variation_digest=self.variation.digest
-        )[0]
-        image_blob = Blob.objects.create(key=self.key)
+        """
+        Records that this variant was processed, with ``image`` as its file.
+
+        The image blob, the record and the attachment linking them are inserted
+        in one transaction, with a single statement each. An existing record
+        is reused and pointed to the new image, including one inserted
+        concurrently by another worker.
+        """
+        image_blob = Blob(key=self.key, backend=self.blob.backend)
         image_blob.unfurl(image)
-        image_blob.save()
-        record.image = image_blob
+
+        try:
+            record = self._save_record(image_blob)
+        except IntegrityError:
+            # Another worker recorded this variant since we looked it up
+            self.refresh()
+            record = self._save_record(image_blob)
+
+        self._remember(record)
         return record
 
-    @contextmanager
-    def process(self):
-        with super().process() as image:
-            self.get_or_create_record(image)
-            image.seek(0)
-            yield image
+    def _save_record(self, image_blob: Blob) -> VariantRecord:
+        with transaction.atomic():
+            image_blob.save(force_insert=True)
+            record = self.record
+            if record is not None:
+                record.image = image_blob
+                return record
+
+            record = VariantRecord(
+                blob=self.blob, variation_digest=self.variation.digest
+            )
+            record.save(force_insert=True)
+            attachment = Attachment.objects.create(
+                blob=image_blob,
+                content_type=ContentType.objects.get_for_model(record),
+                object_id=record.id,
+                name="image",
+                order=0,
+            )
+            VariantRecord.image.related.set_cached_value(record, attachment)
+            return record
+
+    def upload(self, transformed) -> None:
+        # Hash the result while it is uploaded instead of reading it again
+        image = self.blob.ingest(File(transformed, name=self.filename))
+        super().upload(image)
+        self.get_or_create_record(image)
@@ -1,13 +1,45 @@
 import hashlib
 import json
 import mimetypes
+from contextlib import contextmanager
 from typing import Any, Self
 
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+from anchor.services.executors import get_variant_executor
 from anchor.services.transformers.base import BaseTransformer
 from anchor.services.transformers.image import ImageTransformer
 from anchor.settings import anchor_settings
 from anchor.support.base58 import b58encode
-from anchor.support.signing import AnchorSigner
+from anchor.support.lru import LRUCache
+from anchor.support.signing import AnchorSigner, get_signer
+
+
+def canonicalize(transformations: dict[str, Any]) -> dict[str, Any]:
+    """
+    Returns an equivalent transformations dictionary in a canonical form, so
+    that equivalent dictionaries serialize in the same way.
+
+    The ``format`` comes first, followed by the operations in the order in which
+    they are applied. Keyword arguments of operations are sorted by name and
+    tuples become lists.
+    """
+    canonical = {}
+    if "format" in transformations:
+        canonical["format"] = transformations["format"]
+    for name, arguments in transformations.items():
+        if name != "format":
+            canonical[name] = _canonicalize_arguments(arguments)
+    return canonical
+
+
+def _canonicalize_arguments(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {k: _canonicalize_arguments(value[k]) for k in sorted(value)}
+    if isinstance(value, (list, tuple)):
+        return [_canonicalize_arguments(v) for v in value]
+    return value
 
 
 class Variation:
@@ -16,32 +48,99 @@ class Variation:
     """
 
     PURPOSE = "variation"
-    transformations: dict[str, Any]
+
+    preset: str = None
+    """
+    The digest of the registered preset this variation was created from, if
+    any.
+    """
+
+    _decoded = LRUCache(maxsize=1024)
+    _presets: dict[str, dict[str, Any]] = {}
+    _global_presets: dict[str, str] = None
 
     def __init__(self, transformations: dict[str, Any]):
         self.transformations = transformations
 
+    @property
+    def transformations(self) -> dict[str, Any]:
+        """
+        The transformations in this variation, in canonical form (see
+        :py:func:`canonicalize`).
+        """
+        return self._transformations
+
+    @transformations.setter
+    def transformations(self, value: dict[str, Any]) -> None:
+        self._transformations = canonicalize(value)
+        self._memo = {}
+        self.preset = None
+
     @classmethod
     def wrap(cls, value: str | dict[str, Any] | Self) -> Self:
         """
         Returns a variation object, either by decoding a variation key or by
         wrapping a dictionary of transformations.
 
-        If the argument is already a variation object, it is returned as is.
+        Strings can also be the digest of a registered preset or the name of a
+        preset in the ``VARIANTS`` setting. If the argument is already a
+        variation object, it is returned as is.
         """
         if isinstance(value, cls):
             return value
         elif isinstance(value, str):
+            if value in cls._presets:
+                return cls.from_preset(value)
+            digest = cls.global_presets().get(value)
+            if digest is not None:
+                return cls.from_preset(digest)
             return cls.decode(value)
         else:
             return cls(value)
 
+    @classmethod
+    def register_preset(cls, transformations: dict[str, Any]) -> str:
+        """
+        Registers a set of transformations as a preset and returns its digest.
+
+        Presets are identified in URLs by their digest, which is shorter than a
+        variation key and does not need to be signed: only transformations
+        registered as presets are accepted in place of a key.
+        """
+        variation = cls(transformations)
+        cls._presets[variation.digest] = variation.transformations
+        return variation.digest
+
+    @classmethod
+    def global_presets(cls) -> dict[str, str]:
+        """
+        Returns the digests of the presets in the ``VARIANTS`` setting by name,
+        registering them the first time it is called after the setting changes.
+        """
+        if cls._global_presets is None:
+            cls._global_presets = {
+                name: cls.register_preset(transformations)
+                for name, transformations in (anchor_settings.VARIANTS or {}).items()
+            }
+        return cls._global_presets
+
+    @classmethod
+    def from_preset(cls, digest: str) -> Self:
+        """
+        Returns a variation for the preset registered with the given digest.
+        """
+        variation = cls(cls._presets[digest])
+        variation.preset = digest
+        return variation
+
     def default_to(self, default_transformations: dict[str, Any]) -> None:
         """
         Updates the keys missing from this object's ``transformations`` with the
         given ``default_transformations``.
         """
+        preset = self.preset
         self.transformations = {**default_transformations, **self.transformations}
+        self.preset = preset
 
     @property
     def key(self) -> str:
@@ -51,28 +150,69 @@ class Variation:
         Keys are signed to ensure they are not tampered with, but they are
         permanent so they should be shared with care.
         """
-        return type(self).encode(self.transformations)
+        signer = type(self)._get_signer()
+        memo_key = ("key", signer, signer.format or anchor_settings.SIGNING_FORMAT)
+        if memo_key not in self._memo:
+            self._memo[memo_key] = signer.sign(
+                self.transformations, purpose=self.PURPOSE
+            )
+        return self._memo[memo_key]
+
+    @property
+    def url_key(self) -> str:
+        """
+        Identifies this variation in URLs: the digest of its preset if it was
+        created from one, or its signed :py:attr:`key` otherwise.
+        """
+        return self.preset or self.key
+
+    @property
+    def key_digest(self) -> str:
+        """
+        A hash of the variation key in the ``"json"`` signing format, used to
+        name the files of variants.
+
+        It does not depend on the ``SIGNING_FORMAT`` setting, so changing it
+        does not orphan variants that have already been processed.
+        """
+        signer = type(self)._get_signer()
+        memo_key = ("key_digest", signer)
+        if memo_key not in self._memo:
+            key = signer.sign(self.transformations, purpose=self.PURPOSE, format="json")
+            m = hashlib.sha256()
+            m.update(key.encode("utf-8"))
+            self._memo[memo_key] = b58encode(m.digest()).decode("utf-8")
+        return self._memo[memo_key]
 
     @property
     def digest(self) -> str:
         """
         A hash of the transformations dictionary in this variation.
 
-        This is a good way to check if two variations are the same, but keep in
-        mind that order is important in transformations, so two Variations with
-        the same transformations in different orders will have different
-        digests.
+        This is a good way to check if two variations are the same. Keep in mind
+        that the order of operations is important, so two Variations with the
+        same operations in different orders will have different digests. The
+        position of ``format`` and the order of keyword arguments do not matter.
         """
-        m = hashlib.sha1()
-        m.update(json.dumps(self.transformations).encode("utf-8"))
-        return b58encode(m.digest()).decode("utf-8")
+        if "digest" not in self._memo:
+            m = hashlib.sha1()
+            m.update(json.dumps(self.transformations).encode("utf-8"))
+            self._memo["digest"] = b58encode(m.digest()).decode("utf-8")
+        return self._memo["digest"]
 
     @classmethod
     def decode(cls, key: str) -> Self:
         """
         Decodes a signed variation key and returns a Variation.
+
+        Recently decoded keys are remembered, so decoding the same key again
+        does not verify its signature again.
         """
-        transformations = cls._get_signer().unsign(key, purpose=cls.PURPOSE)
+        signer = cls._get_signer()
+        transformations = cls._decoded.get((signer, key))
+        if transformations is None:
+            transformations = signer.unsign(key, purpose=cls.PURPOSE)
+            cls._decoded.set((signer, key), transformations)
         return cls(transformations)
 
     @classmethod
@@ -80,19 +220,55 @@ class Variation:
         """
         Encodes a transformations dictionary as a signed string.
         """
-        return cls._get_signer().sign(transformations, purpose=cls.PURPOSE)
+        return cls._get_signer().sign(
+            canonicalize(transformations), purpose=cls.PURPOSE
+        )
 
     @classmethod
     def _get_signer(cls) -> AnchorSigner:
-        return AnchorSigner()
+        return get_signer()
 
     def transform(self, file):
         """
         Applies the transformations to the given file and makes it available as
         a temporary file in a context manager.
         """
-        format = self.transformations.get("format", "png")
-        return self.transformer.transform(file, format=format)
+        return self.transformer.transform(file, format=self.format)
+
+    @classmethod
+    @contextmanager
+    def transform_many(cls, variations: list[Self], file):
+        """
+        Applies each of the given variations to the given file, decoding it only
+        once, and makes the results available as a list of temporary files in a
+        context manager.
+        """
+        outputs = get_variant_executor().transform_many(
+            ImageTransformer({}),
+            file,
+            [(variation.operations, variation.format) for variation in variations],
+        )
+        try:
+            for output in outputs:
+                output.seek(0)
+            yield outputs
+        finally:
+            for output in outputs:
+                output.close()
+
+    @property
+    def format(self) -> str:
+        """
+        The format of the result of applying this variation.
+        """
+        return self.transformations.get("format", "png")
+
+    @property
+    def operations(self) -> dict[str, Any]:
+        """
+        The transformations in this variation, except for the ``format``.
+        """
+        return {k: v for (k, v) in self.transformations.items() if k != "format"}
 
     @property
     def transformer(self) -> BaseTransformer:
@@ -100,9 +276,7 @@ class Variation:
         Returns the transformer to be used to perform the transformations in
         this variation.
         """
-        return ImageTransformer(
-            {k: v for (k, v) in self.transformations.items() if k != "format"}
-        )
+        return ImageTransformer(self.operations)
 
     @property
     def mime_type(self) -> str:
@@ -118,3 +292,9 @@ class Variation:
             mimetypes.guess_type(random_filename)[0]
             or anchor_settings.DEFAULT_MIME_TYPE
         )
+
+
+@receiver(setting_changed)
+def _clear_global_presets_on_setting_changed(*, setting, **kwargs):
+    if setting == "ANCHOR":
+        Variation._global_presets = None
@@ -0,0 +1,54 @@
+"""
+Executors run background work, like generating the eager variants of a freshly
+attached file, after the transaction that scheduled it commits.
+
+The :py:class:`InlineExecutor` runs work immediately in the calling thread and
+the :py:class:`ThreadPoolExecutor` hands it to a pool of threads in the same
+process. The :py:class:`ProcessPoolExecutor` also runs the transformations of
+variants in a pool of worker processes with time and memory limits.
+
+To use an external task queue, subclass :py:class:`BaseExecutor` and enqueue the
+function and its arguments, which are always importable functions and plain
+strings, from :py:meth:`BaseExecutor.submit`.
+"""
+
+import threading
+
+from django.utils.module_loading import import_string
+
+from anchor.settings import anchor_settings
+
+from .base import BaseExecutor
+from .inline import InlineExecutor
+from .process_pool import ProcessPoolExecutor
+from .thread_pool import ThreadPoolExecutor
+
+__all__ = [
+    "BaseExecutor",
+    "InlineExecutor",
+    "ProcessPoolExecutor",
+    "ThreadPoolExecutor",
+    "get_variant_executor",
+]
+
+_executors: dict[str, BaseExecutor] = {}
+_lock = threading.Lock()
+
+
+def get_variant_executor() -> BaseExecutor:
+    """
+    Returns the executor configured in the ``VARIANT_EXECUTOR`` setting.
+
+    Executors are built once per class and shared, so that a thread pool is
+    reused between calls.
+    """
+    path = anchor_settings.VARIANT_EXECUTOR
+    try:
+        return _executors[path]
+    except KeyError:
+        pass
+
+    with _lock:
+        if path not in _executors:
+            _executors[path] = import_string(path)()
+        return _executors[path]
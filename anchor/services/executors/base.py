@@ -0,0 +1,38 @@
+from typing import Any, Callable
+
+
+class BaseExecutor:
+    """
+    Interface for executors.
+
+    Executors must implement :py:meth:`submit`. They are built without
+    arguments and shared by all callers in a process, so they must be safe to
+    use from several threads.
+
+    Executors also run the transformations of variants, which happen in the
+    calling thread unless :py:meth:`transform` and :py:meth:`transform_many`
+    are overridden.
+    """
+
+    def submit(self, fn: Callable, *args) -> None:
+        """
+        Schedules ``fn(*args)`` to be called.
+
+        ``fn`` is a module-level function and ``args`` are plain values, so
+        they can be serialized and sent to another process.
+        """
+        raise NotImplementedError()
+
+    def transform(self, transformer, file, format: str):
+        """
+        Returns the result of ``transformer.process(file, format)``.
+        """
+        return transformer.process(file, format)
+
+    def transform_many(
+        self, transformer, file, chains: list[tuple[dict[str, Any], str]]
+    ) -> list[Any]:
+        """
+        Returns the result of ``transformer.process_many(file, chains)``.
+        """
+        return transformer.process_many(file, chains)
@@ -0,0 +1,21 @@
+import logging
+from typing import Callable
+
+from .base import BaseExecutor
+
+logger = logging.getLogger("anchor")
+
+
+class InlineExecutor(BaseExecutor):
+    """
+    Runs work immediately in the calling thread.
+
+    Errors are logged to the ``anchor`` logger instead of being raised, since
+    work usually runs once the transaction that scheduled it has committed.
+    """
+
+    def submit(self, fn: Callable, *args) -> None:
+        try:
+            fn(*args)
+        except Exception:
+            logger.exception("Error running %s", fn.__name__)
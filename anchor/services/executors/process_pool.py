@@ -0,0 +1,214 @@
+import io
+import threading
+from typing import Any
+
+from .thread_pool import ThreadPoolExecutor
+
+
+class ProcessPoolExecutor(ThreadPoolExecutor):
+    """
+    Runs the transformations of variants in a pool of worker processes, so that
+    a huge or malicious image cannot exhaust the CPU or memory of the web
+    server.
+
+    Each transformation gets :py:attr:`timeout` seconds, the memory of each
+    worker is capped to :py:attr:`memory_limit` bytes and images larger than
+    :py:attr:`max_pixels` are refused before they are decoded. Workers that time
+    out or die are killed and replaced, and workers are recycled after
+    :py:attr:`max_jobs_per_process` transformations. In all these cases the
+    transformation raises a :py:class:`TransformationError
+    <anchor.services.transformers.base.TransformationError>`.
+
+    Background work is run by a pool of threads like in the
+    :py:class:`ThreadPoolExecutor`. Subclass this executor to change its
+    settings.
+    """
+
+    processes: int = 2
+    """
+    The maximum number of worker processes.
+    """
+
+    timeout: float = 30
+    """
+    The maximum time in seconds a transformation may take.
+    """
+
+    memory_limit: int = 1024 * 1024 * 1024
+    """
+    The maximum address space of each worker in bytes, enforced with
+    ``RLIMIT_AS`` on platforms that support it. ``None`` disables the limit.
+    """
+
+    max_pixels: int = 50_000_000
+    """
+    The maximum number of pixels of images to transform, checked in the worker
+    from the image header. ``None`` only applies Pillow's own
+    ``PIL.Image.MAX_IMAGE_PIXELS`` protection.
+    """
+
+    max_jobs_per_process: int = 100
+    """
+    The number of transformations after which a worker is replaced.
+    """
+
+    start_method: str = "spawn"
+    """
+    The :py:mod:`multiprocessing` start method used to create workers.
+
+    Spawned workers start a fresh interpreter and set up Django from
+    ``DJANGO_SETTINGS_MODULE``, which takes a moment but only happens once per
+    worker. ``"fork"`` starts faster, but copies the address space of the web
+    server, which counts towards :py:attr:`memory_limit`, and can deadlock on
+    locks held by its other threads.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._slots = threading.BoundedSemaphore(self.processes)
+        self._idle: list[_Worker] = []
+        self._lock = threading.Lock()
+
+    def transform(self, transformer, file, format: str):
+        (output,) = self._call(transformer, "process", file, format)
+        return output
+
+    def transform_many(
+        self, transformer, file, chains: list[tuple[dict[str, Any], str]]
+    ) -> list[Any]:
+        return self._call(transformer, "process_many", file, chains)
+
+    def _call(self, transformer, method: str, file, *args) -> list[Any]:
+        from anchor.services.transformers.base import TransformationError
+
+        transformer.prepare()
+        job = (transformer, method, file.read(), args)
+
+        with self._slots:
+            worker = self._get_worker()
+            try:
+                ok, result = worker.call(job, self.timeout)
+            except TimeoutError:
+                worker.stop()
+                raise TransformationError(
+                    f"Transformation timed out after {self.timeout} seconds"
+                )
+            except (EOFError, OSError):
+                worker.stop()
+                raise TransformationError("Transformation worker exited")
+
+            self._release_worker(worker)
+
+        if not ok:
+            raise TransformationError(result)
+
+        outputs = []
+        for data, format in result:
+            output = transformer._get_temporary_file(format)
+            output.write(data)
+            output.seek(0)
+            outputs.append(output)
+        return outputs
+
+    def _get_worker(self) -> "_Worker":
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+
+        import multiprocessing
+
+        context = multiprocessing.get_context(self.start_method)
+        return _Worker(context, self.memory_limit, self.max_pixels)
+
+    def _release_worker(self, worker: "_Worker") -> None:
+        if worker.jobs >= self.max_jobs_per_process:
+            worker.stop()
+            return
+
+        with self._lock:
+            self._idle.append(worker)
+
+
+class _Worker:
+    def __init__(self, context, memory_limit: int | None, max_pixels: int | None):
+        self.connection, child = context.Pipe()
+        self.process = context.Process(
+            target=_serve, args=(child, memory_limit, max_pixels), daemon=True
+        )
+        self.process.start()
+        child.close()
+        self.jobs = 0
+
+    def call(self, job: tuple, timeout: float) -> tuple[bool, Any]:
+        self.jobs += 1
+        self.connection.send(job)
+        if not self.connection.poll(timeout):
+            raise TimeoutError()
+        return self.connection.recv()
+
+    def stop(self) -> None:
+        self.process.kill()
+        self.process.join()
+        self.connection.close()
+
+
+def _serve(connection, memory_limit: int | None, max_pixels: int | None) -> None:
+    """
+    Runs transformations received from the parent process until it goes away.
+    """
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+
+    if memory_limit:
+        try:
+            import resource
+
+            resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+        except (ImportError, ValueError, OSError):  # pragma: no cover
+            pass
+
+    while True:
+        try:
+            transformer, method, data, args = connection.recv()
+        except EOFError:
+            return
+
+        try:
+            if max_pixels:
+                _check_pixels(data, max_pixels)
+            outputs = getattr(transformer, method)(io.BytesIO(data), *args)
+            if method == "process":
+                results = [(_read(outputs), args[0])]
+            else:
+                results = [
+                    (_read(output), format)
+                    for output, (_, format) in zip(outputs, args[0])
+                ]
+            connection.send((True, results))
+        except Exception as e:
+            connection.send((False, str(e) or type(e).__name__))
+
+
+def _check_pixels(data: bytes, max_pixels: int) -> None:
+    from PIL import Image
+
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            width, height = image.size
+    except OSError:
+        # Not an image, the transformer decides what to do with it
+        return
+
+    if width * height > max_pixels:
+        raise Image.DecompressionBombError(
+            f"Image size ({width}x{height}) exceeds the limit of {max_pixels} pixels"
+        )
+
+
+def _read(output) -> bytes:
+    with output:
+        output.seek(0)
+        return output.read()
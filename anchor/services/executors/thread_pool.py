@@ -0,0 +1,40 @@
+import concurrent.futures
+import logging
+from typing import Callable
+
+from django.db import connections
+
+from .base import BaseExecutor
+
+logger = logging.getLogger("anchor")
+
+
+class ThreadPoolExecutor(BaseExecutor):
+    """
+    Runs work in a pool of threads of the current process.
+
+    Work is lost if the process exits before it is done. Errors are logged to
+    the ``anchor`` logger.
+    """
+
+    max_workers: int = 4
+    """
+    The number of threads in the pool.
+    """
+
+    def __init__(self):
+        self.pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="anchor"
+        )
+
+    def submit(self, fn: Callable, *args) -> concurrent.futures.Future:
+        return self.pool.submit(self._run, fn, *args)
+
+    def _run(self, fn: Callable, *args) -> None:
+        try:
+            fn(*args)
+        except Exception:
+            logger.exception("Error running %s in the background", fn.__name__)
+        finally:
+            # Database connections are per thread, don't leave them open
+            connections.close_all()
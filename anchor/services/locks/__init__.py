@@ -0,0 +1,36 @@
+"""
+Locks make sure that expensive work, like generating a variant, is only done
+once when many requests need its result at the same time.
+
+The first caller to acquire the lock for a name does the work, while the others
+wait until it is released (or until ``VARIANT_LOCK_TIMEOUT`` passes) and then
+find the result ready. Use :py:class:`FileLock` to coordinate processes on a
+single host and :py:class:`DatabaseLock` to coordinate a cluster of hosts
+sharing a database.
+"""
+
+from django.utils.module_loading import import_string
+
+from anchor.settings import anchor_settings
+
+from .base import BaseLock, LockTimeout
+from .database import DatabaseLock
+from .file import FileLock
+
+__all__ = [
+    "BaseLock",
+    "DatabaseLock",
+    "FileLock",
+    "LockTimeout",
+    "get_variant_lock",
+]
+
+
+def get_variant_lock() -> BaseLock | None:
+    """
+    Returns an instance of the lock class configured in the
+    ``VARIANT_LOCK_BACKEND`` setting, or ``None`` if locking is disabled.
+    """
+    if not anchor_settings.VARIANT_LOCK_BACKEND:
+        return None
+    return import_string(anchor_settings.VARIANT_LOCK_BACKEND)()
@@ -0,0 +1,70 @@
+import time
+from contextlib import contextmanager
+from typing import Any
+
+from anchor.settings import anchor_settings
+
+
+class LockTimeout(Exception):
+    """
+    Raised when a lock could not be acquired before the timeout expired.
+    """
+
+    pass
+
+
+class BaseLock:
+    """
+    Interface for named, exclusive locks.
+
+    Subclasses implement :py:meth:`try_acquire` and :py:meth:`release`, and
+    callers use the :py:meth:`lock` context manager, which waits for the lock
+    to become available:
+
+    >>> with FileLock().lock("variants/abc/def"):
+    ...     do_expensive_work()
+    """
+
+    poll_interval: float = 0.05
+    """
+    Seconds to wait between attempts to acquire a lock held by someone else.
+    """
+
+    def __init__(self, timeout: float = None):
+        if timeout is None:
+            timeout = anchor_settings.VARIANT_LOCK_TIMEOUT.total_seconds()
+        self.timeout = timeout
+
+    @contextmanager
+    def lock(self, name: str):
+        """
+        Holds the lock with the given ``name`` while the context is active.
+
+        Raises :py:exc:`LockTimeout` if the lock is not acquired within
+        ``timeout`` seconds.
+        """
+        deadline = time.monotonic() + self.timeout
+        while (handle := self.try_acquire(name)) is None:
+            if time.monotonic() >= deadline:
+                raise LockTimeout(f'Timed out waiting for lock "{name}"')
+            time.sleep(self.poll_interval)
+
+        try:
+            yield
+        finally:
+            self.release(handle)
+
+    def try_acquire(self, name: str) -> Any:
+        """
+        Attempts to acquire the lock without blocking.
+
+        Returns a handle to pass to :py:meth:`release` if the lock was
+        acquired, or ``None`` if it is held by someone else.
+        """
+        raise NotImplementedError()
+
+    def release(self, handle: Any) -> None:
+        """
+        Releases a lock acquired with :py:meth:`try_acquire`.
+        """
+        raise NotImplementedError()
@@ -0,0 +1,50 @@
+from django.db import IntegrityError, router, transaction
+from django.utils import timezone
+
+from anchor.settings import anchor_settings
+
+from .base import BaseLock
+
+
+class DatabaseLock(BaseLock):
+    """
+    Locks rows of the :py:class:`Lock <anchor.models.lock.Lock>` table.
+
+    A lock is held by inserting a row with its name, which is unique, and
+    released by deleting it. Works across all hosts sharing the database, and
+    with every database backend supported by Django.
+
+    Rows expire after ``lease`` seconds (ten times the ``timeout`` by default),
+    so locks left behind by crashed workers are eventually taken over.
+
+    Rows are written in a transaction of their own, which only commits if no
+    transaction is already open on the connection. With ``ATOMIC_REQUESTS``,
+    or when variants are processed inside ``transaction.atomic()``, other
+    workers do not see the lock until the outer transaction ends, and may block
+    on it instead of waiting for ``timeout``. In that case, point ``using`` (or
+    the ``VARIANT_LOCK_DATABASE`` setting) to a second database alias for the
+    same database, with ``ATOMIC_REQUESTS`` disabled.
+    """
+
+    def __init__(self, lease: float = None, using: str = None, **kwargs):
+        super().__init__(**kwargs)
+        self.lease = lease if lease is not None else 10 * self.timeout
+        self.using = using or anchor_settings.VARIANT_LOCK_DATABASE
+
+    def try_acquire(self, name: str) -> str | None:
+        from anchor.models import Lock
+
+        now = timezone.now()
+        expires_at = now + timezone.timedelta(seconds=self.lease)
+        locks = Lock.objects.db_manager(self.using or router.db_for_write(Lock))
+        try:
+            with transaction.atomic(using=locks.db):
+                locks.filter(name=name, expires_at__lte=now).delete()
+                return locks.create(name=name, expires_at=expires_at).pk
+        except IntegrityError:
+            return None
+
+    def release(self, handle: str) -> None:
+        from anchor.models import Lock
+
+        Lock.objects.db_manager(self.using).filter(pk=handle).delete()
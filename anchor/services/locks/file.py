@@ -0,0 +1,59 @@
+import hashlib
+import os
+import tempfile
+
+from django.core.exceptions import ImproperlyConfigured
+
+from anchor.settings import anchor_settings
+
+from .base import BaseLock
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+class FileLock(BaseLock):
+    """
+    Locks files in a local directory with ``flock``.
+
+    Works across threads and processes on the same host, but not across hosts
+    unless the directory is on a file system with reliable ``flock`` support.
+    Lock files are small and are not deleted.
+    """
+
+    def __init__(self, directory: str = None, **kwargs):
+        if fcntl is None:
+            raise ImproperlyConfigured("FileLock requires a POSIX system")
+
+        super().__init__(**kwargs)
+        self.directory = (
+            directory
+            or anchor_settings.VARIANT_LOCK_DIRECTORY
+            or os.path.join(tempfile.gettempdir(), "anchor-locks")
+        )
+
+    def try_acquire(self, name: str) -> int | None:
+        os.makedirs(self.directory, exist_ok=True)
+        fd = os.open(self.path(name), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return None
+        return fd
+
+    def release(self, handle: int) -> None:
+        try:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+        finally:
+            os.close(handle)
+
+    def path(self, name: str) -> str:
+        """
+        Returns the path of the file backing the lock with the given name.
+        """
+        return os.path.join(
+            self.directory, hashlib.sha256(name.encode("utf-8")).hexdigest()
+        )
@@ -1,3 +1,6 @@
+from typing import Any
+
+
 class BaseProcessor:
     """
     Interface for file processors.
@@ -11,6 +14,14 @@ class BaseProcessor:
     implementation.
     """
 
+    errors: tuple[type[Exception], ...] = ()
+    """
+    Exceptions raised by the processor for files it cannot process, e.g.
+    corrupt or oversized files. Transformers report them as
+    :py:class:`TransformationError
+    <anchor.services.transformers.base.TransformationError>`.
+    """
+
     def source(self, file):
         """
         Set up the processor to work with the given file.
@@ -20,6 +31,17 @@ class BaseProcessor:
         """
         raise NotImplementedError()
 
+    def plan(self, chains: list[dict[str, Any]]):
+        """
+        Called after :py:meth:`source` and before any transformation with every
+        chain of transformations that will be applied to the source.
+
+        Processors can use this hook to prepare the decoding of the source, e.g.
+        decoding it at a reduced size if all chains start by downscaling it.
+        The default implementation does nothing.
+        """
+        return self
+
     def save(self, file, format: str):
         """
         Save the processed file to the given file-like object.
@@ -31,3 +53,15 @@ class BaseProcessor:
         as, like ``'jpeg'`` or ``'png'``.
         """
         raise NotImplementedError()
+
+    def copy(self):
+        """
+        Returns a new processor with an independent copy of the current state
+        of the file, so that different transformations can be applied to the
+        same decoded source.
+
+        Processors that implement this method can generate many outputs from a
+        single decode with :py:meth:`ImageTransformer.process_many
+        <anchor.services.transformers.image.ImageTransformer.process_many>`.
+        """
+        raise NotImplementedError()
@@ -1,7 +1,12 @@
+import copy
+from typing import Any
+
 from PIL import Image
 
 from .base import BaseProcessor
 
+DOWNSCALES = ("resize_to_limit", "resize_to_fit")
+
 
 class PillowProcessor(BaseProcessor):
     """
@@ -10,10 +15,72 @@ class PillowProcessor(BaseProcessor):
 
     To use this processor, make sure to install the Pillow library: ``pip
     install Pillow``.
+
+    Options can be set with the ``IMAGE_PROCESSOR_OPTIONS`` setting:
+
+    - ``resample``: the resampling filter used when resizing, as a
+      ``PIL.Image.Resampling`` value or its name (e.g. ``"lanczos"``).
+      Defaults to bicubic.
+    - ``reducing_gap``: lets Pillow first shrink images by an integer factor
+      with :py:meth:`PIL.Image.Image.reduce`, which is much faster, as long as
+      the result is at least ``reducing_gap`` times larger than the target
+      size. ``None`` disables it. Defaults to ``2.0``.
+    - ``draft``: whether to decode JPEG images directly at 1/2, 1/4 or 1/8 of
+      their size when every output is small enough. Defaults to ``True``.
+    - ``save_options``: extra keyword arguments for
+      :py:meth:`PIL.Image.Image.save` by format, e.g. ``{"jpeg": {"quality":
+      85, "progressive": True}, "webp": {"quality": 80}}``.
+    - ``max_pixels``: refuse images with more pixels than this before decoding
+      them. Defaults to ``None``, which only applies Pillow's own
+      ``PIL.Image.MAX_IMAGE_PIXELS`` protection.
     """
 
+    errors = (OSError, Image.DecompressionBombError)
+
+    def __init__(
+        self,
+        resample: Image.Resampling | str = Image.Resampling.BICUBIC,
+        reducing_gap: float | None = 2.0,
+        draft: bool = True,
+        save_options: dict[str, dict[str, Any]] = None,
+        max_pixels: int = None,
+    ):
+        if isinstance(resample, str):
+            resample = Image.Resampling[resample.upper()]
+        self.resample = resample
+        self.reducing_gap = reducing_gap
+        self.draft = draft
+        self.save_options = save_options or {}
+        self.max_pixels = max_pixels
+
     def source(self, file):
         self.source = Image.open(file)
+        if self.max_pixels and self.source.width * self.source.height > self.max_pixels:
+            raise Image.DecompressionBombError(
+                f"Image size ({self.source.width}x{self.source.height}) exceeds "
+                f"the limit of {self.max_pixels} pixels"
+            )
+        return self
+
+    def plan(self, chains: list[dict[str, Any]]):
+        """
+        Decodes JPEG images at a reduced size when every chain starts by
+        downscaling them, keeping at least ``reducing_gap`` times the largest
+        target size.
+        """
+        if not self.draft or not chains:
+            return self
+
+        width = height = 0
+        for transformations in chains:
+            operation, args = next(iter(transformations.items()), (None, None))
+            if operation not in DOWNSCALES:
+                return self
+            box = (args["width"], args["height"]) if isinstance(args, dict) else args
+            width, height = max(width, box[0]), max(height, box[1])
+
+        gap = self.reducing_gap or 1
+        self.source.draft(None, (int(width * gap), int(height * gap)))
         return self
 
     def resize_to_fit(self, width: int, height: int):
@@ -25,7 +92,7 @@ class PillowProcessor(BaseProcessor):
         than the provided rectangle. If the image is smaller than the provided
         dimensions, it will be upscaled.
         """
-        self.source.thumbnail((width, height))
+        self._thumbnail(width, height)
         return self
 
     def resize_to_limit(self, width: int, height: int):
@@ -39,9 +106,14 @@ class PillowProcessor(BaseProcessor):
         if self.source.width <= width and self.source.height <= height:
             return self
 
-        self.source.thumbnail((width, height))
+        self._thumbnail(width, height)
         return self
 
+    def _thumbnail(self, width: int, height: int):
+        self.source.thumbnail(
+            (width, height), resample=self.resample, reducing_gap=self.reducing_gap
+        )
+
     def rotate(self, degrees: int):
         """
         Rotates the image by the given angle.
@@ -49,6 +121,13 @@ class PillowProcessor(BaseProcessor):
         self.source.rotate(degrees)
         return self
 
+    def copy(self):
+        processor = copy.copy(self)
+        processor.source = self.source.copy()
+        return processor
+
     def save(self, file, format: str):
-        self.source.save(file, format=format)
+        self.source.save(
+            file, format=format, **self.save_options.get(format.lower(), {})
+        )
         return self
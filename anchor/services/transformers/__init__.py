@@ -6,7 +6,7 @@ and delegate actual transformations to :py:mod:`processors
 <anchor.services.processors>`.
 """
 
-from .base import BaseTransformer
+from .base import BaseTransformer, TransformationError
 from .image import ImageTransformer
 
-__all__ = ["BaseTransformer", "ImageTransformer"]
+__all__ = ["BaseTransformer", "ImageTransformer", "TransformationError"]
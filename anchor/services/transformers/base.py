@@ -2,6 +2,16 @@ import tempfile
 from contextlib import contextmanager
 from typing import Any
 
+from anchor.services.executors import get_variant_executor
+from anchor.settings import anchor_settings
+
+
+class TransformationError(ValueError):
+    """
+    Raised when a file cannot be transformed, e.g. because it is corrupt, too
+    large, or its processing timed out.
+    """
+
 
 class BaseTransformer:
     """
@@ -19,14 +29,24 @@ class BaseTransformer:
     def transform(self, file, format: str):
         """
         Applies transformation to the given file and yields a temporary file in the specified format.
+
+        The work is done by the ``VARIANT_EXECUTOR``, which may run it in
+        another process.
         """
-        output = self.process(file, format)
+        output = get_variant_executor().transform(self, file, format)
         try:
             output.seek(0)
             yield output
         finally:
             output.close()
 
+    def prepare(self) -> None:
+        """
+        Resolves everything this transformer needs from the settings of the
+        current process, before it is sent to another process. The default
+        implementation does nothing.
+        """
+
     def process(self, file, format: str):
         """
         Given a buffer and an output format, returns an open temporary file with
@@ -35,4 +55,12 @@ class BaseTransformer:
         raise NotImplementedError()
 
     def _get_temporary_file(self, format: str):
-        return tempfile.NamedTemporaryFile(suffix=f".{format}", mode="w+b", delete=True)
+        max_size = anchor_settings.VARIANT_SPOOL_MAX_SIZE
+        if not max_size:
+            return tempfile.NamedTemporaryFile(
+                suffix=f".{format}", mode="w+b", delete=True
+            )
+
+        return tempfile.SpooledTemporaryFile(
+            max_size=max_size, suffix=f".{format}", mode="w+b"
+        )
@@ -1,11 +1,18 @@
+from contextlib import contextmanager
 from functools import cached_property
+from typing import Any
 
 from django.utils.module_loading import import_string
 
 from anchor.services.processors.base import BaseProcessor
 from anchor.settings import anchor_settings
 
-from .base import BaseTransformer
+from .base import BaseTransformer, TransformationError
+
+DOWNSCALES = ("resize_to_limit", "resize_to_fit")
+"""
+Transformations that only make an image smaller while keeping its aspect ratio.
+"""
 
 
 class ImageTransformer(BaseTransformer):
@@ -14,18 +21,76 @@ class ImageTransformer(BaseTransformer):
         self.processor_class = processor_class
 
     def process(self, file, format: str):
-        self.processor.source(file)
-        for key, args in self.transformations.items():
-            self.processor = self.apply_transformation(self.processor, key, args)
+        with self._processor_errors():
+            self.processor.source(file)
+            self.processor.plan([self.transformations])
+            for key, args in self.transformations.items():
+                self.processor = self.apply_transformation(self.processor, key, args)
+
+            temp = self._get_temporary_file(format)
+            try:
+                self.processor.save(temp, format)
+            except BaseException:
+                temp.close()
+                raise
+            return temp
+
+    def process_many(self, file, chains: list[tuple[dict[str, Any], str]]) -> list[Any]:
+        """
+        Decodes the given file once and applies each of the given chains of
+        transformations to a copy of it.
+
+        ``chains`` is a list of ``(transformations, format)`` pairs. Returns an
+        open temporary file for each chain, in the same order. The processor
+        must implement :py:meth:`copy()
+        <anchor.services.processors.base.BaseProcessor.copy>`.
 
-        temp = self._get_temporary_file(format)
-        self.processor.save(temp, format)
-        return temp
+        Chains consisting of a single downscale are processed from the largest
+        to the smallest, and each one starts from the smallest output already
+        produced that is at least as large, instead of from the full-size image.
+        """
+        with self._processor_errors():
+            self.processor.source(file)
+            self.processor.plan([transformations for transformations, _ in chains])
+            outputs = [None] * len(chains)
+            downscaled = []
+            try:
+                for index in sorted(
+                    range(len(chains)), key=lambda i: -_box_area(chains[i][0])
+                ):
+                    transformations, format = chains[index]
+                    box = _downscale_box(transformations)
+                    start = self.processor
+                    if box is not None:
+                        start = next(
+                            (
+                                processor
+                                for (width, height), processor in reversed(downscaled)
+                                if width >= box[0] and height >= box[1]
+                            ),
+                            start,
+                        )
+
+                    processor = start.copy()
+                    for key, args in transformations.items():
+                        processor = self.apply_transformation(processor, key, args)
+                    if box is not None:
+                        downscaled.append((box, processor))
+
+                    outputs[index] = self._get_temporary_file(format)
+                    processor.save(outputs[index], format)
+            except BaseException:
+                for output in outputs:
+                    if output is not None:
+                        output.close()
+                raise
+
+            return outputs
 
     def apply_transformation(self, processor, key, args):
         method = getattr(processor, key, None)
         if method is None:
-            raise ValueError(
+            raise TransformationError(
                 f'Transformation "{key}" is not supported by the processor "{type(processor)}"'
             )
 
@@ -36,12 +101,48 @@ class ImageTransformer(BaseTransformer):
 
         return processor
 
+    @contextmanager
+    def _processor_errors(self):
+        # Report files the processor cannot handle with a single exception type
+        try:
+            yield
+        except self.processor.errors as e:
+            raise TransformationError(str(e)) from e
+
+    def prepare(self) -> None:
+        self.processor = self.get_processor()
+
     def get_processor(self):
-        processor_class = self.processor_class or import_string(
-            anchor_settings.IMAGE_PROCESSOR
-        )
-        return processor_class()
+        if self.processor_class is not None:
+            return self.processor_class()
+
+        processor_class = import_string(anchor_settings.IMAGE_PROCESSOR)
+        return processor_class(**(anchor_settings.IMAGE_PROCESSOR_OPTIONS or {}))
 
     @cached_property
     def processor(self):
         return self.get_processor()
+
+
+def _downscale_box(transformations: dict[str, Any]) -> tuple[int, int] | None:
+    """
+    Returns the bounding box of a chain consisting of a single downscale, or
+    ``None`` for other chains.
+    """
+    if len(transformations) != 1:
+        return None
+
+    (key, args), *_ = transformations.items()
+    if key not in DOWNSCALES:
+        return None
+    if isinstance(args, dict):
+        return args["width"], args["height"]
+    return tuple(args)
+
+
+def _box_area(transformations: dict[str, Any]) -> float:
+    box = _downscale_box(transformations)
+    if box is None:
+        # Chains that don't start from other outputs are processed first
+        return float("inf")
+    return box[0] * box[1]
@@ -1,4 +1,8 @@
+import threading
+
 from django.core.files.storage import storages
+from django.core.signals import setting_changed
+from django.dispatch import receiver
 
 from .base import BaseURLGenerator
 from .file_system import FileSystemURLGenerator
@@ -9,22 +13,65 @@ __all__ = [
     "FileSystemURLGenerator",
     "S3URLGenerator",
     "get_for_backend",
+    "register",
 ]
 
+_registry: dict[str, type[BaseURLGenerator]] = {
+    "django.core.files.storage.FileSystemStorage": FileSystemURLGenerator,
+    "storages.backends.s3.S3Storage": S3URLGenerator,
+}
+_generators: dict[str, BaseURLGenerator] = {}
+_lock = threading.Lock()
+
+
+def register(storage_class: str, generator_class: type[BaseURLGenerator]) -> None:
+    """
+    Registers a ``URLGenerator`` class for backends using the given storage.
+
+    The ``storage_class`` must be the dotted path used in the ``BACKEND`` key of
+    ``settings.STORAGES``. Third-party storages can call this function, for
+    instance from their ``AppConfig.ready()``, to customize how URLs are
+    generated for their files:
+
+    >>> from anchor.services.urls import BaseURLGenerator, register
+    >>>
+    >>> class CDNURLGenerator(BaseURLGenerator):
+    ...     def url(self, key, **kwargs):
+    ...         return f"https://cdn.example.com/{key}"
+    ...
+    >>> register("myapp.storages.CDNStorage", CDNURLGenerator)
+    """
+    with _lock:
+        _registry[storage_class] = generator_class
+        _generators.clear()
+
 
 def get_for_backend(backend: str) -> BaseURLGenerator:
     """
     Given a Django storage backend name, return a ``URLGenerator`` instance that
     can work with it.
 
-    If no suitable generator is found, this function will return the
+    Generators are chosen according to the storage class of the backend (see
+    :py:func:`register`) and reused for every call with the same backend name.
+    If no suitable generator is found, this function will return a
     :py:class:`BaseURLGenerator` which delegates URL generation to the storage
     backend.
     """
-    backend_config = storages.backends[backend]
-    if backend_config["BACKEND"] == "django.core.files.storage.FileSystemStorage":
-        return FileSystemURLGenerator(backend)
-    elif backend_config["BACKEND"] == "storages.backends.s3.S3Storage":
-        return S3URLGenerator(backend)
-    else:
-        return BaseURLGenerator(backend)
+    try:
+        return _generators[backend]
+    except KeyError:
+        pass
+
+    with _lock:
+        if backend not in _generators:
+            storage_class = storages.backends[backend]["BACKEND"]
+            generator_class = _registry.get(storage_class, BaseURLGenerator)
+            _generators[backend] = generator_class(backend)
+        return _generators[backend]
+
+
+@receiver(setting_changed)
+def _clear_generators_on_setting_changed(*, setting, **kwargs):
+    if setting == "STORAGES":
+        with _lock:
+            _generators.clear()
@@ -1,6 +1,8 @@
-from django.core.files.storage import Storage, storages
+from django.core.files.storage import Storage
 from django.utils import timezone
 
+from anchor.support.storage import get_storage
+
 
 class BaseURLGenerator:
     """
@@ -18,7 +20,7 @@ class BaseURLGenerator:
 
     def __init__(self, backend: str = "default"):
         self.backend = backend
-        self.storage = storages.create_storage(storages.backends[self.backend])
+        self.storage = get_storage(self.backend)
 
     def url(
         self,
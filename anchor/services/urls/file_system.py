@@ -3,7 +3,7 @@ from django.utils import timezone
 
 from anchor.services.urls.base import BaseURLGenerator
 from anchor.settings import anchor_settings
-from anchor.support.signing import AnchorSigner
+from anchor.support.signing import AnchorSigner, get_signer
 
 
 class FileSystemURLGenerator(BaseURLGenerator):
@@ -39,4 +39,4 @@ class FileSystemURLGenerator(BaseURLGenerator):
 
     @property
     def signer(self) -> AnchorSigner:
-        return AnchorSigner()
+        return get_signer()
@@ -20,16 +20,110 @@ class AnchorSettings:
     file extension.
     """
 
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024
+    """
+    Size in bytes of the chunks in which files are read when uploading them.
+
+    Files are hashed and measured as they are streamed to the storage backend,
+    so larger chunks mean less per-chunk overhead at the cost of memory.
+    """
+
+    CHECKSUM_ALGORITHM: str = "md5"
+    """
+    The hash algorithm used to compute blob checksums. One of ``"md5"``,
+    ``"sha256"``, ``"blake2b"`` or ``"xxh3_128"`` (requires the ``xxhash``
+    package).
+
+    Checksums record the algorithm that produced them, so changing this setting
+    does not invalidate the checksums of existing blobs.
+    """
+
+    DEDUPLICATE_BLOBS: bool = False
+    """
+    Reuse the stored file of an existing blob when a file with the same checksum
+    and size is uploaded to the same backend.
+
+    Deduplicated blobs keep their own ``key`` and share the stored file through
+    their ``shared_key``. Files are only deleted from the storage backend when
+    the last blob referencing them is purged. Consider using a stronger
+    ``CHECKSUM_ALGORITHM`` than MD5 when enabling this setting.
+    """
+
+    SIGNING_FORMAT: str = "json"
+    """
+    The format of signed blob IDs, file system URLs and variation keys. Either
+    ``"json"`` or ``"compact"``.
+
+    Compact tokens pack the expiration and purpose in a small binary header
+    instead of a JSON document, which makes them shorter and faster to verify.
+    Tokens in either format are always accepted, so this setting can be changed
+    without breaking existing URLs.
+    """
+
+    COMPACT_SIGNATURE_SIZE: int = None
+    """
+    Number of bytes of the HMAC kept in compact tokens, at least 16. Defaults to
+    the full digest size of the signing algorithm (32 bytes for SHA-256).
+
+    Compact tokens signed with fewer bytes than this are rejected.
+    """
+
+    SIGNED_URL_BUCKET: timedelta = None
+    """
+    Round the expiration of signed IDs and URLs created with ``expires_in`` up to
+    the next multiple of this duration, e.g. ``timedelta(minutes=5)``.
+
+    All URLs for a blob generated within the same window are then identical, so
+    browsers and CDNs can cache them, and Anchor reuses the signed token instead
+    of computing it again. URLs remain valid for at least ``expires_in`` and at
+    most ``expires_in`` plus this duration. It must be at least one second.
+    Disabled by default.
+    """
+
     FILE_SYSTEM_BACKEND_EXPIRATION: timedelta = timedelta(hours=1)
     """
     How long URLs generated for the file system backend should be valid for.
     """
 
+    SERVE_MODE: str = "redirect"
+    """
+    How the blob and representation views respond. ``"redirect"`` redirects to
+    the URL of the file in its storage backend. ``"proxy"`` streams the file
+    from the storage backend in the same response, which saves clients a round
+    trip for small files such as thumbnails.
+    """
+
+    SERVE_CHUNK_SIZE: int = 64 * 1024
+    """
+    Size in bytes of the chunks in which files are streamed when ``SERVE_MODE``
+    is ``"proxy"``. At most one chunk per response is held in memory.
+    """
+
+    SERVE_MAX_AGE: timedelta = timedelta(hours=1)
+    """
+    How long browsers may cache files streamed when ``SERVE_MODE`` is
+    ``"proxy"``, in the ``Cache-Control`` header of responses.
+    """
+
     IMAGE_PROCESSOR: str = "anchor.services.processors.pillow.PillowProcessor"
     """
     The image processor to use for image transformations.
     """
 
+    IMAGE_PROCESSOR_OPTIONS: dict[str, Any] = None
+    """
+    Keyword arguments used to build the ``IMAGE_PROCESSOR``, e.g. the
+    resampling filter or the encoder options of the :py:class:`PillowProcessor
+    <anchor.services.processors.pillow.PillowProcessor>`.
+    """
+
+    VARIANT_SPOOL_MAX_SIZE: int = 1024 * 1024
+    """
+    Size in bytes up to which processed variants are kept in memory before
+    being uploaded. Larger variants are written to a temporary file on disk. Set
+    to ``0`` to always use temporary files.
+    """
+
     TRACK_VARIANTS: bool = True
     """
     Store variant records in the database.
@@ -40,6 +134,89 @@ class AnchorSettings:
     The default format to use for variants.
     """
 
+    VARIANTS: dict[str, dict[str, Any]] = None
+    """
+    Named variant presets available for all blobs, e.g.
+    ``{"thumb": {"resize_to_limit": (200, 200)}}``.
+
+    Presets can be referenced by name in the ``representation_url`` template
+    tag and in :py:meth:`Blob.representation()
+    <anchor.models.blob.representations.RepresentationsMixin.representation>`.
+    Their URLs identify them by digest instead of by a signed variation key.
+    Presets can also be declared per field with the ``variants`` argument of
+    :py:class:`SingleAttachmentField
+    <anchor.models.fields.SingleAttachmentField>`.
+    """
+
+    VARIANT_LOCK_BACKEND: str = None
+    """
+    The lock class used to make sure each variant is generated only once when
+    many requests ask for it at the same time, e.g.
+    ``"anchor.services.locks.FileLock"`` for a single host or
+    ``"anchor.services.locks.DatabaseLock"`` for a cluster. Disabled by default.
+    """
+
+    VARIANT_LOCK_TIMEOUT: timedelta = timedelta(seconds=30)
+    """
+    How long to wait for another worker to finish generating a variant before
+    giving up and responding with ``503 Service Unavailable``.
+    """
+
+    VARIANT_LOCK_DIRECTORY: str = None
+    """
+    The directory where ``FileLock`` keeps its lock files. Defaults to an
+    ``anchor-locks`` directory in the system's temporary directory.
+    """
+
+    VARIANT_LOCK_DATABASE: str = None
+    """
+    The database alias where ``DatabaseLock`` keeps its locks. Defaults to the
+    alias chosen by the database routers for writes. Use an alias with
+    ``ATOMIC_REQUESTS`` disabled, so that locks taken while handling a request
+    are visible to other workers right away.
+    """
+
+    VARIANT_EXECUTOR: str = "anchor.services.executors.InlineExecutor"
+    """
+    The executor that generates eager variants once a file is attached, e.g.
+    ``"anchor.services.executors.ThreadPoolExecutor"`` to generate them in
+    background threads instead of before the response is sent.
+    """
+
+    VARIANT_EXISTENCE_CACHE: str = None
+    """
+    The alias of a Django cache in which the keys of processed variants are
+    remembered when ``TRACK_VARIANTS`` is off, e.g. ``"default"``, so that
+    checking whether a variant exists does not query the storage backend.
+    Disabled by default.
+    """
+
+    VARIANT_EXISTENCE_MAX_AGE: timedelta = timedelta(seconds=60)
+    """
+    How long each process remembers in memory that a variant exists when
+    ``TRACK_VARIANTS`` is off. Variants deleted by another process may be
+    reported as processed for this long. Set to zero to disable.
+    """
+
+    VARIANT_FAILURE_CACHE: str = None
+    """
+    The alias of a Django cache in which variants that failed to process are
+    remembered, e.g. ``"default"``. Requests for them fail immediately, without
+    reading the original file again, until their backoff expires. Disabled by
+    default.
+    """
+
+    VARIANT_FAILURE_BACKOFF: timedelta = timedelta(minutes=1)
+    """
+    How long to refuse processing a variant after its first failure. The delay
+    doubles with each consecutive failure, up to ``VARIANT_FAILURE_MAX_BACKOFF``.
+    """
+
+    VARIANT_FAILURE_MAX_BACKOFF: timedelta = timedelta(hours=1)
+    """
+    The maximum delay before processing a failing variant again.
+    """
+
     ADMIN_UPLOAD_TO: str = "admin-uploads/%Y/%m/%d/"
     """
     The prefix to use for files uploaded via the Django admin interface.
@@ -0,0 +1,82 @@
+"""
+Checksum algorithms supported for blobs.
+
+Checksums are stored as URL-safe base64-encoded digests prefixed by the name of
+the algorithm that produced them, like ``sha256:n4bQgYhMfWWaL-qgxVrQFaO_TxsrC4Is0V1sFbDwCgg=``.
+MD5 checksums are stored without a prefix for compatibility with blobs created
+before the algorithm became configurable.
+"""
+
+import base64
+import hashlib
+from typing import Any, Callable
+
+from django.core.exceptions import ImproperlyConfigured
+
+LEGACY_ALGORITHM = "md5"
+"""
+The algorithm assumed for checksums without a prefix.
+"""
+
+SEPARATOR = ":"
+
+
+def _xxh3_128():
+    try:
+        import xxhash
+    except ImportError:
+        raise ImproperlyConfigured(
+            'The "xxh3_128" checksum algorithm requires the xxhash package: '
+            "pip install xxhash"
+        )
+
+    return xxhash.xxh3_128()
+
+
+ALGORITHMS: dict[str, Callable[[], Any]] = {
+    "md5": hashlib.md5,
+    "sha256": hashlib.sha256,
+    "blake2b": hashlib.blake2b,
+    "xxh3_128": _xxh3_128,
+}
+"""
+Maps algorithm names to factories of ``hashlib``-compatible hash objects.
+
+Hash objects from ``hashlib`` release the GIL while hashing large chunks, so
+files can be hashed in parallel threads.
+"""
+
+
+def get_hasher(algorithm: str):
+    """
+    Returns a new hash object for the given algorithm name.
+    """
+    try:
+        factory = ALGORITHMS[algorithm]
+    except KeyError:
+        raise ImproperlyConfigured(
+            f'Unsupported checksum algorithm "{algorithm}". '
+            f"Choose one of: {', '.join(ALGORITHMS)}"
+        )
+
+    return factory()
+
+
+def format_checksum(algorithm: str, digest: bytes) -> str:
+    """
+    Encodes a digest as a checksum string tagged with its algorithm.
+    """
+    encoded = base64.urlsafe_b64encode(digest).decode("utf-8")
+    if algorithm == LEGACY_ALGORITHM:
+        return encoded
+    return f"{algorithm}{SEPARATOR}{encoded}"
+
+
+def parse_checksum(checksum: str) -> tuple[str, bytes]:
+    """
+    Splits a checksum string into its algorithm name and raw digest.
+    """
+    algorithm, separator, encoded = checksum.rpartition(SEPARATOR)
+    if not separator:
+        algorithm = LEGACY_ALGORITHM
+    return algorithm, base64.urlsafe_b64decode(encoded)
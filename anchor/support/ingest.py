@@ -0,0 +1,161 @@
+"""
+Computes file metadata while the file is being read by someone else, usually a
+storage backend saving it.
+
+This allows uploading a file and calculating its checksum, size and type in a
+single pass over its contents.
+"""
+
+import os
+from io import UnsupportedOperation
+from typing import Any
+
+from django.core.files import File as DjangoFile
+
+from anchor.support.checksums import format_checksum, get_hasher
+
+HEAD_SIZE = 64
+"""
+Number of bytes kept from the start of the file for content sniffing.
+"""
+
+# Magic numbers for the file types Anchor cares the most about. Formats are
+# checked in order, so put more specific signatures first.
+SIGNATURES: list[tuple[int, bytes, str]] = [
+    (0, b"\x89PNG\r\n\x1a\n", "image/png"),
+    (0, b"\xff\xd8\xff", "image/jpeg"),
+    (0, b"GIF87a", "image/gif"),
+    (0, b"GIF89a", "image/gif"),
+    (8, b"WEBP", "image/webp"),
+    (4, b"ftypavif", "image/avif"),
+    (4, b"ftypheic", "image/heic"),
+    (0, b"BM", "image/bmp"),
+    (0, b"II*\x00", "image/tiff"),
+    (0, b"MM\x00*", "image/tiff"),
+    (0, b"%PDF-", "application/pdf"),
+]
+
+
+def sniff_mime_type(head: bytes) -> str | None:
+    """
+    Guesses the MIME type of a file from its first bytes.
+
+    Returns ``None`` if the signature is not recognized.
+    """
+    for offset, signature, mime_type in SIGNATURES:
+        if head[offset : offset + len(signature)] == signature:
+            return mime_type
+
+    return None
+
+
+class IngestFile(DjangoFile):
+    """
+    Wraps a file so that its checksum, size and leading bytes are computed as
+    it is read.
+
+    Reading starts from the beginning of the file, like ``File.chunks`` does.
+    Storage backends can consume this object like any other Django ``File``,
+    and see the ``content_type`` of the wrapped file if it has one.
+    Bytes are only hashed once, even if the backend seeks back and reads some
+    of them again. Call :py:meth:`finish` after the backend is done to read
+    whatever it skipped, if anything.
+    """
+
+    def __init__(
+        self,
+        file: DjangoFile | Any,
+        chunk_size: int,
+        algorithm: str = "md5",
+    ):
+        super().__init__(file, name=getattr(file, "name", None))
+        content_type = getattr(file, "content_type", None)
+        if content_type:
+            self.content_type = content_type
+        self.chunk_size = chunk_size
+        self.algorithm = algorithm
+        self.hasher = get_hasher(algorithm)
+        self.head = b""
+        self.byte_size = 0
+        self._position = 0
+        self._hashed_until = 0
+        self._complete = False
+        try:
+            self.seek(0)
+        except (AttributeError, UnsupportedOperation):
+            pass
+
+    def _tell(self) -> int:
+        try:
+            return self.file.tell()
+        except (AttributeError, UnsupportedOperation):
+            return self._position
+
+    def read(self, *args, **kwargs):
+        data = self.file.read(*args, **kwargs)
+        start = self._position
+        self._position += len(data)
+        if start <= self._hashed_until < self._position:
+            self._consume(data[self._hashed_until - start :])
+        elif not data and start == self._hashed_until and args[:1] != (0,):
+            self._complete = True
+        return data
+
+    def seek(self, *args, **kwargs):
+        position = self.file.seek(*args, **kwargs)
+        self._position = position if position is not None else self._tell()
+        return position
+
+    def tell(self) -> int:
+        return self._position
+
+    def chunks(self, chunk_size: int = None):
+        return super().chunks(chunk_size=chunk_size or self.chunk_size)
+
+    def _consume(self, data: bytes | str) -> None:
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+
+        self.hasher.update(data)
+        self.byte_size += len(data)
+        self._hashed_until = self._position
+        if len(self.head) < HEAD_SIZE:
+            self.head += data[: HEAD_SIZE - len(self.head)]
+
+    def finish(self) -> None:
+        """
+        Reads the part of the file that hasn't been consumed yet, if any.
+
+        Files which have been read to the end already only cost one empty read.
+        Raises ``ValueError`` if the file was closed before it was read to the
+        end, since its checksum and size would be wrong.
+        """
+        if getattr(self.file, "closed", False):
+            if not self._complete:
+                raise ValueError(
+                    "The file was closed before it was read entirely, "
+                    "its checksum cannot be computed"
+                )
+            return
+
+        if self._position != self._hashed_until:
+            self.seek(self._hashed_until, os.SEEK_SET)
+
+        while self.read(self.chunk_size):
+            pass
+
+    @property
+    def digest(self) -> bytes:
+        return self.hasher.digest()
+
+    @property
+    def checksum(self) -> str:
+        """
+        The digest of the file formatted as a checksum string, see
+        :py:func:`anchor.support.checksums.format_checksum`.
+        """
+        return format_checksum(self.algorithm, self.digest)
+
+    @property
+    def sniffed_mime_type(self) -> str | None:
+        return sniff_mime_type(self.head)
@@ -1,13 +1,57 @@
 """
 Extends Django's signing module to make it easier to work with object keys and
 key expirations.
+
+Values can be signed in two formats. The ``"json"`` format is Django's: a
+base64-encoded JSON document with the value, purpose and expiration, followed
+by ``:`` and the signature. The ``"compact"`` format packs the same data in a
+binary token, encoded as unpadded URL-safe base64:
+
+* a version byte, a flags byte and the size of the signature in bytes,
+* the expiration as a 32-bit Unix timestamp, when present,
+* the purpose as one byte indexing ``COMPACT_PURPOSES``, or ``0xFF`` followed by
+  its length and UTF-8 encoding for other purposes,
+* the value, either as UTF-8 text or as JSON,
+* the HMAC of all of the above, truncated to the signature size.
+
+Compact tokens never contain ``:``, which is how both formats are told apart.
 """
 
 import base64
-from typing import Any, Type
+import binascii
+import datetime
+import hashlib
+import hmac
+import json
+import math
+import struct
+from functools import cached_property, lru_cache
+from typing import Any, Iterable, Type
 
-from django.core.signing import BadSignature, JSONSerializer, Signer
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signing import BadSignature, JSONSerializer, Signer, b64_encode
 from django.utils import timezone
+from django.utils.encoding import force_bytes
+
+from anchor.settings import anchor_settings
+from anchor.support.lru import LRUCache
+
+FORMATS = ("json", "compact")
+
+COMPACT_VERSION = 1
+
+COMPACT_PURPOSES = (None, "variation", "file_system")
+"""
+Purposes encoded as a single byte in compact tokens. New purposes must be
+appended so that existing tokens remain valid.
+"""
+
+MIN_COMPACT_SIGNATURE_SIZE = 16
+
+_FLAG_EXPIRES = 0b01
+_FLAG_JSON = 0b10
+_CUSTOM_PURPOSE = 0xFF
 
 
 class ExpiredSignature(BadSignature):
@@ -31,9 +75,35 @@ class AnchorSigner(Signer):
     PURPOSE_KEY = "p"
     VALUE_KEY = "v"
 
-    def __init__(self, *args, serializer: Type[Any] = Serializer, **kwargs):
+    def __init__(
+        self,
+        *args,
+        serializer: Type[Any] = Serializer,
+        format: str = None,
+        **kwargs,
+    ):
         super().__init__(*args, **kwargs)
         self.serializer = serializer()
+        self.format = format
+        self._derived_keys = {}
+        self._tokens = LRUCache(maxsize=1024)
+
+    def signature(self, value: str, key: str = None) -> str:
+        # Equivalent to Signer.signature, but the HMAC key is derived from the
+        # secret key only once.
+        return b64_encode(self._hmac(key or self.key, force_bytes(value))).decode()
+
+    def _hmac(self, key: str, message: bytes) -> bytes:
+        try:
+            derived_key = self._derived_keys[key]
+        except KeyError:
+            hasher = getattr(hashlib, self.algorithm)
+            derived_key = self._derived_keys.setdefault(
+                key,
+                hasher(force_bytes(self.salt + "signer") + force_bytes(key)).digest(),
+            )
+
+        return hmac.digest(derived_key, message, self.algorithm)
 
     def sign(
         self,
@@ -41,22 +111,65 @@ class AnchorSigner(Signer):
         expires_in: timezone.timedelta = None,
         expires_at: timezone.datetime = None,
         purpose: str = None,
+        format: str = None,
     ) -> str:
-        return super().sign(
-            self.serializer.dumps(
-                self.prepare_value(value, expires_in, expires_at, purpose)
+        to_sign = self.prepare_value(value, expires_in, expires_at, purpose)
+        format = format or self.format or anchor_settings.SIGNING_FORMAT
+        if expires_in and anchor_settings.SIGNED_URL_BUCKET:
+            # Tokens are identical for the whole bucket, so compute them once
+            cache_key = (
+                format,
+                anchor_settings.COMPACT_SIGNATURE_SIZE,
+                purpose,
+                to_sign[self.EXPIRES_AT_KEY],
+                value if isinstance(value, str) else json.dumps(value),
             )
-        )
+            return self._tokens.get_or_set(
+                cache_key, lambda: self._sign(to_sign, format)
+            )
+
+        return self._sign(to_sign, format)
+
+    def sign_many(
+        self,
+        values: Iterable[Any],
+        expires_in: timezone.timedelta = None,
+        expires_at: timezone.datetime = None,
+        purpose: str = None,
+    ) -> list[str]:
+        """
+        Signs many values with the same expiration and purpose.
+
+        The expiration is computed once for the whole batch and settings are
+        read only once, which makes this faster than calling :py:meth:`sign` for
+        each value.
+        """
+        template = self.prepare_value(None, expires_in, expires_at, purpose)
+        format = self.format or anchor_settings.SIGNING_FORMAT
+        return [
+            self._sign({**template, self.VALUE_KEY: value}, format) for value in values
+        ]
+
+    def _sign(self, to_sign: dict[str, Any], format: str) -> str:
+        if format == "compact":
+            return self.sign_compact(to_sign)
+        if format != "json":
+            raise ImproperlyConfigured(
+                f'Unsupported signing format "{format}". '
+                f"Choose one of: {', '.join(FORMATS)}"
+            )
+
+        return super().sign(self.serializer.dumps(to_sign))
 
     def unsign(
         self,
         signed_value: str,
         purpose: str = None,
     ) -> str:
-        try:
+        if self.sep in signed_value:
             from_signature = self.serializer.loads(super().unsign(signed_value))
-        except BadSignature:
-            raise
+        else:
+            from_signature = self.unsign_compact(signed_value)
 
         if purpose and from_signature.get(self.PURPOSE_KEY) != purpose:
             raise InvalidPurpose("Purpose mismatch")
@@ -79,6 +192,9 @@ class AnchorSigner(Signer):
         to_sign = {}
         if expires_in:
             expires_at = timezone.now() + expires_in
+            bucket = anchor_settings.SIGNED_URL_BUCKET
+            if bucket:
+                expires_at = round_up(expires_at, bucket)
 
         if expires_at:
             to_sign[self.EXPIRES_AT_KEY] = int(expires_at.timestamp())
@@ -86,3 +202,143 @@ class AnchorSigner(Signer):
             to_sign[self.PURPOSE_KEY] = purpose
         to_sign[self.VALUE_KEY] = value
         return to_sign
+
+    def sign_compact(self, to_sign: dict[str, Any]) -> str:
+        """
+        Signs a dictionary returned by :py:meth:`prepare_value` as a compact
+        token.
+        """
+        size = self.compact_signature_size
+        flags = 0
+        body = b""
+
+        if self.EXPIRES_AT_KEY in to_sign:
+            flags |= _FLAG_EXPIRES
+            body += struct.pack(">I", to_sign[self.EXPIRES_AT_KEY])
+
+        purpose = to_sign.get(self.PURPOSE_KEY)
+        if purpose in COMPACT_PURPOSES:
+            body += bytes([COMPACT_PURPOSES.index(purpose)])
+        else:
+            encoded_purpose = purpose.encode()
+            if len(encoded_purpose) > 255:
+                raise ValueError("Purposes of compact tokens must fit in 255 bytes")
+            body += bytes([_CUSTOM_PURPOSE, len(encoded_purpose)]) + encoded_purpose
+
+        value = to_sign[self.VALUE_KEY]
+        if isinstance(value, str):
+            body += value.encode()
+        else:
+            flags |= _FLAG_JSON
+            body += json.dumps(value, separators=(",", ":")).encode()
+
+        message = bytes([COMPACT_VERSION, flags, size]) + body
+        token = message + self._hmac(self.key, message)[:size]
+        return base64.urlsafe_b64encode(token).rstrip(b"=").decode()
+
+    def unsign_compact(self, token: str) -> dict[str, Any]:
+        """
+        Verifies a compact token and returns the dictionary it was signed from.
+        """
+        try:
+            data = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        except (binascii.Error, ValueError):
+            raise BadSignature("Malformed compact token")
+
+        if len(data) < 4 or data[0] != COMPACT_VERSION:
+            raise BadSignature("Unsupported compact token")
+
+        flags, size = data[1], data[2]
+        if size > self._digest_size or (
+            size < self._digest_size and size < self.compact_signature_size
+        ):
+            raise BadSignature("Signature size not allowed")
+
+        message, signature = data[:-size], data[-size:]
+        for key in [self.key, *self.fallback_keys]:
+            if hmac.compare_digest(self._hmac(key, message)[:size], signature):
+                break
+        else:
+            raise BadSignature(f'Signature "{token}" does not match')
+
+        try:
+            return self._parse_compact(flags, message[3:])
+        except (IndexError, struct.error, UnicodeDecodeError, ValueError):
+            raise BadSignature("Malformed compact token")
+
+    def _parse_compact(self, flags: int, body: bytes) -> dict[str, Any]:
+        from_signature = {}
+        offset = 0
+        if flags & _FLAG_EXPIRES:
+            (from_signature[self.EXPIRES_AT_KEY],) = struct.unpack_from(">I", body)
+            offset += 4
+
+        purpose_index = body[offset]
+        offset += 1
+        if purpose_index == _CUSTOM_PURPOSE:
+            length = body[offset]
+            purpose = body[offset + 1 : offset + 1 + length].decode()
+            offset += 1 + length
+        else:
+            purpose = COMPACT_PURPOSES[purpose_index]
+        if purpose is not None:
+            from_signature[self.PURPOSE_KEY] = purpose
+
+        value = body[offset:].decode()
+        from_signature[self.VALUE_KEY] = (
+            json.loads(value) if flags & _FLAG_JSON else value
+        )
+        return from_signature
+
+    @property
+    def compact_signature_size(self) -> int:
+        size = anchor_settings.COMPACT_SIGNATURE_SIZE or self._digest_size
+        if not MIN_COMPACT_SIGNATURE_SIZE <= size <= self._digest_size:
+            raise ImproperlyConfigured(
+                f"COMPACT_SIGNATURE_SIZE must be between "
+                f"{MIN_COMPACT_SIGNATURE_SIZE} and {self._digest_size} bytes"
+            )
+        return size
+
+    @cached_property
+    def _digest_size(self) -> int:
+        return getattr(hashlib, self.algorithm)().digest_size
+
+
+def round_up(
+    moment: timezone.datetime, bucket: timezone.timedelta
+) -> timezone.datetime:
+    """
+    Rounds a datetime up to the next multiple of ``bucket`` since the Unix
+    epoch.
+    """
+    seconds = int(bucket.total_seconds())
+    timestamp = -(-math.ceil(moment.timestamp()) // seconds) * seconds
+    return datetime.datetime.fromtimestamp(timestamp, tz=datetime.timezone.utc)
+
+
+def get_signer(
+    key: str = None, salt: str = None, algorithm: str = None
+) -> AnchorSigner:
+    """
+    Returns a shared :py:class:`AnchorSigner` for the given parameters.
+
+    Signers are cached per combination of secret key, fallback keys, salt and
+    algorithm, so a new signer is built whenever ``SECRET_KEY`` or
+    ``SECRET_KEY_FALLBACKS`` change.
+    """
+    return _get_signer(
+        key or settings.SECRET_KEY,
+        tuple(settings.SECRET_KEY_FALLBACKS) if key is None else (),
+        salt,
+        algorithm,
+    )
+
+
+@lru_cache(maxsize=16)
+def _get_signer(
+    key: str, fallback_keys: tuple[str, ...], salt: str, algorithm: str
+) -> AnchorSigner:
+    return AnchorSigner(
+        key=key, fallback_keys=fallback_keys, salt=salt, algorithm=algorithm
+    )
@@ -0,0 +1,47 @@
+"""
+A process-wide registry of storage instances.
+
+Building a storage from its configuration can be expensive (e.g. S3 storages
+may set up a boto3 session), so Anchor builds one instance per backend and
+shares it between threads. Instances are discarded when the ``STORAGES`` setting
+changes.
+"""
+
+import threading
+
+from django.core.files.storage import Storage, storages
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+_storages: dict[str, Storage] = {}
+_lock = threading.Lock()
+
+
+def get_storage(backend: str) -> Storage:
+    """
+    Returns the storage instance for the backend with the given name in
+    ``settings.STORAGES``, creating it the first time it is requested.
+    """
+    try:
+        return _storages[backend]
+    except KeyError:
+        pass
+
+    with _lock:
+        if backend not in _storages:
+            _storages[backend] = storages.create_storage(storages.backends[backend])
+        return _storages[backend]
+
+
+def clear_storages() -> None:
+    """
+    Discards all storage instances so that they are built again on next use.
+    """
+    with _lock:
+        _storages.clear()
+
+
+@receiver(setting_changed)
+def _clear_storages_on_setting_changed(*, setting, **kwargs):
+    if setting == "STORAGES":
+        clear_storages()
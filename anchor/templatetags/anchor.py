@@ -29,15 +29,23 @@ def blob_url(value: Blob | Attachment | None):
 
 
 @register.simple_tag
-def representation_url(value: Variant | Blob | Attachment | None, **transformations):
+def representation_url(
+    value: Variant | Blob | Attachment | None, preset: str = None, **transformations
+):
     """
     Return a signed URL for a transformation of the given Attachment or Blob.
+
+    Transformations can be given as keyword arguments or as the name of a
+    preset declared on the attachment field or in the ``VARIANTS`` setting:
+    ``{% representation_url movie.cover "thumb" %}``.
     """
     if value is None or value == "":
         return ""
 
     if isinstance(value, Variant):
         variant = value
+    elif preset is not None:
+        variant = value.representation(preset)
     else:
         variant = value.representation(_preprocess_transformations(transformations))
 
@@ -45,7 +53,7 @@ def representation_url(value: Variant | Blob | Attachment | None, **transformati
         "anchor:representation",
         kwargs={
             "signed_blob_id": variant.blob.signed_id,
-            "variation_key": variant.variation.key,
+            "variation_key": variant.variation.url_key,
         },
     )
 
@@ -4,11 +4,27 @@ from django.http.response import HttpResponseRedirect
 from django.views import View
 
 from anchor.models import Blob
+from anchor.settings import anchor_settings
 
+from .mixins import ServeMixin
 
-class BlobRedirectView(View):
+
+class BlobRedirectView(ServeMixin, View):
     def get(self, request, signed_id, filename=None):
         blob = self.get_blob(signed_id)
+        if self.get_serve_mode() == "proxy":
+            try:
+                return self.stream(
+                    request,
+                    blob.storage,
+                    blob.storage_key,
+                    content_type=blob.mime_type or anchor_settings.DEFAULT_MIME_TYPE,
+                    etag=blob.checksum,
+                    size=blob.byte_size,
+                    filename=blob.filename,
+                )
+            except FileNotFoundError:
+                raise Http404("Not Found")
         return HttpResponseRedirect(blob.url())
 
     def get_blob(self, signed_id):
@@ -1,4 +1,3 @@
-from django.core.files.storage import storages
 from django.core.signing import BadSignature
 from django.http import Http404
 from django.http.response import FileResponse
@@ -6,13 +5,14 @@ from django.views import View
 
 from anchor.models import Blob
 from anchor.settings import anchor_settings
+from anchor.support.storage import get_storage
 
 
 class FileSystemView(View):
     def get(self, request, signed_key, filename=None):
         try:
             key = Blob.unsign_id(signed_key, purpose="file_system")
-            service = storages.create_storage(storages.backends[key["backend"]])
+            service = get_storage(key["backend"])
             disposition = key.get("disposition", "inline")
             response = FileResponse(
                 service.open(key["key"]),
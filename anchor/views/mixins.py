@@ -0,0 +1,79 @@
+from django.core.files.storage import Storage
+from django.http import HttpResponse
+from django.http.response import FileResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+
+from anchor.settings import anchor_settings
+
+SERVE_MODES = ("redirect", "proxy")
+
+# Images that can run scripts when opened from the application's origin
+UNSAFE_IMAGE_TYPES = ("image/svg+xml",)
+
+
+class ServeMixin:
+    """
+    Lets views either redirect to files or stream them, according to the
+    ``SERVE_MODE`` setting.
+    """
+
+    serve_mode: str = None
+    """
+    Overrides the ``SERVE_MODE`` setting for this view.
+    """
+
+    def get_serve_mode(self) -> str:
+        return self.serve_mode or anchor_settings.SERVE_MODE
+
+    def stream(
+        self,
+        request,
+        storage: Storage,
+        key: str,
+        content_type: str,
+        etag: str = None,
+        size: int = None,
+        filename: str = None,
+    ) -> HttpResponse:
+        """
+        Streams the file stored under ``key`` in chunks of ``SERVE_CHUNK_SIZE``
+        bytes.
+
+        Files are immutable, so requests with a matching ``If-None-Match``
+        header get a ``304 Not Modified`` response without opening the file.
+
+        Files are served from the application's origin, so only images are
+        displayed inline and browsers are told not to sniff their type. Other
+        files, including SVG images, are downloaded as attachments.
+        """
+        etag = quote_etag(etag) if etag else None
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = FileResponse(
+                storage.open(key),
+                content_type=content_type,
+                filename=filename,
+                as_attachment=not is_inline(content_type),
+            )
+            response.block_size = anchor_settings.SERVE_CHUNK_SIZE
+            if size is not None:
+                response["Content-Length"] = str(size)
+        if etag:
+            response["ETag"] = etag
+        response["X-Content-Type-Options"] = "nosniff"
+
+        patch_cache_control(
+            response,
+            private=True,
+            max_age=int(anchor_settings.SERVE_MAX_AGE.total_seconds()),
+        )
+        return response
+
+
+def is_inline(content_type: str) -> bool:
+    """
+    Whether files of the given content type can be displayed inline.
+    """
+    content_type = content_type.split(";")[0].strip().lower()
+    return content_type.startswith("image/") and content_type not in UNSAFE_IMAGE_TYPES
@@ -1,18 +1,59 @@
 from django.core.signing import BadSignature
-from django.http import Http404, HttpResponseRedirect
+from django.http import Http404, HttpResponse, HttpResponseRedirect
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
 from django.views import View
 
 from anchor.models import Blob, Variant
+from anchor.services.locks import LockTimeout
+from anchor.services.transformers import TransformationError
 
+from .mixins import ServeMixin
 
-class RepresentationView(View):
+
+class RepresentationView(ServeMixin, View):
     def get(self, request, signed_blob_id, variation_key, filename=None):
-        representation: Variant = self.get_representation(signed_blob_id, variation_key)
+        proxy = self.get_serve_mode() == "proxy"
+        try:
+            representation: Variant = self.get_representation(
+                signed_blob_id, variation_key, process=not proxy
+            )
+            if proxy:
+                return self.stream_representation(request, representation)
+        except LockTimeout:
+            # Another worker is still generating this variant
+            return HttpResponse(status=503, headers={"Retry-After": "1"})
+        except TransformationError as e:
+            # The original file cannot be transformed, e.g. it is too large
+            retry_after = getattr(e, "retry_after", None)
+            headers = {"Retry-After": str(retry_after)} if retry_after else {}
+            return HttpResponse(status=422, headers=headers)
         return HttpResponseRedirect(representation.url())
 
-    def get_representation(self, signed_blob_id, variation_key):
+    def get_representation(self, signed_blob_id, variation_key, process=True):
         try:
             blob = Blob.objects.get_signed(signed_blob_id)
-            return blob.representation(variation_key).processed
+            representation = blob.representation(variation_key)
         except (Blob.DoesNotExist, BadSignature):
             raise Http404("Not Found")
+        return representation.processed if process else representation
+
+    def stream_representation(self, request, representation: Variant):
+        # Variants never change, so clients with a cached copy skip processing.
+        # Their key includes the blob key, so it is unique to this blob.
+        etag = representation.key
+        not_modified = get_conditional_response(request, etag=quote_etag(etag))
+        if not_modified is None:
+            representation = representation.processed
+
+        try:
+            return self.stream(
+                request,
+                representation.storage,
+                representation.key,
+                content_type=representation.variation.mime_type,
+                etag=etag,
+                filename=representation.filename,
+            )
+        except FileNotFoundError:
+            raise Http404("Not Found")
@@ -0,0 +1,36 @@
+"""
+Micro-benchmarks for hot paths in Anchor.
+
+They are skipped unless the ``ANCHOR_BENCHMARKS`` environment variable is set,
+and they only report timings, they never fail because of them:
+
+    ANCHOR_BENCHMARKS=1 uv run python tests/run.py benchmarks
+"""
+
+import os
+import sys
+import time
+import unittest
+
+benchmark = unittest.skipUnless(
+    os.environ.get("ANCHOR_BENCHMARKS"), "Set ANCHOR_BENCHMARKS=1 to run benchmarks"
+)
+
+
+def measure_rate(fn, duration: float = 0.5) -> float:
+    """
+    Calls ``fn`` repeatedly for about ``duration`` seconds and returns the number
+    of calls per second.
+    """
+    calls = 0
+    start = time.perf_counter()
+    deadline = start + duration
+    while (now := time.perf_counter()) < deadline:
+        fn()
+        calls += 1
+    return calls / (now - start)
+
+
+def report(name: str, **rates: float) -> None:
+    results = ", ".join(f"{label}: {rate:,.0f}/s" for label, rate in rates.items())
+    print(f"\n{name}: {results}", file=sys.stderr)
@@ -0,0 +1,79 @@
+import json
+import subprocess
+import sys
+import tempfile
+import textwrap
+import unittest
+
+from django.test import SimpleTestCase
+from PIL import Image
+
+from . import benchmark
+
+# Runs in a fresh interpreter so that the peak memory of each configuration is
+# measured on its own. The peak is read from /proc, so this only runs on Linux.
+# Disabling ``draft`` reproduces the code path from before plan() existed:
+# thumbnail() still drafts a single variant, processed with process(), but not
+# the copies of a decoded image that process_many() works on.
+SCRIPT = textwrap.dedent(
+    """
+    import functools, json, sys, time
+    from django.conf import settings
+    settings.configure()
+    from anchor.services.processors.pillow import PillowProcessor
+    from anchor.services.transformers.image import ImageTransformer
+
+    path, chains, options = sys.argv[1], json.loads(sys.argv[2]), json.loads(sys.argv[3])
+    processor_class = functools.partial(PillowProcessor, **options)
+    start = time.perf_counter()
+    for _ in range(5):
+        with open(path, "rb") as f:
+            if len(chains) == 1:
+                (transformations, format), = chains
+                transformer = ImageTransformer(transformations, processor_class=processor_class)
+                outputs = [transformer.process(f, format)]
+            else:
+                transformer = ImageTransformer({}, processor_class=processor_class)
+                outputs = transformer.process_many(f, chains)
+            for output in outputs:
+                output.close()
+    latency = (time.perf_counter() - start) / 5
+    with open("/proc/self/status") as status:
+        peak = next(int(l.split()[1]) for l in status if l.startswith("VmHWM"))
+    print(json.dumps({"latency": latency, "peak": peak}))
+    """
+)
+
+
+def run(path: str, chains: list, **options) -> dict[str, float]:
+    output = subprocess.run(
+        [sys.executable, "-c", SCRIPT, path, json.dumps(chains), json.dumps(options)],
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout
+    return json.loads(output)
+
+
+@benchmark
+@unittest.skipUnless(sys.platform == "linux", "Reads peak memory from /proc")
+class TestImageProcessingBenchmark(SimpleTestCase):
+    def test_jpeg_thumbnails(self):
+        single = [[{"resize_to_limit": [300, 300]}, "webp"]]
+        many = [[{"resize_to_limit": [size, size]}, "webp"] for size in (600, 300, 150)]
+        with tempfile.NamedTemporaryFile(suffix=".jpg") as f:
+            image = Image.effect_noise((6000, 4000), 64).convert("RGB")
+            image.save(f, format="jpeg", quality=90)
+            f.flush()
+
+            for name, chains in (("one variant", single), ("three variants", many)):
+                before = run(f.name, chains, draft=False)
+                after = run(f.name, chains)
+                print(
+                    f"\nJPEG 6000x4000, {name}: "
+                    f"before: {before['latency'] * 1000:,.0f} ms, "
+                    f"{before['peak'] / 1024:,.0f} MiB peak RSS, "
+                    f"after: {after['latency'] * 1000:,.0f} ms, "
+                    f"{after['peak'] / 1024:,.0f} MiB peak RSS",
+                    file=sys.stderr,
+                )
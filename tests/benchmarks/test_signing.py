@@ -0,0 +1,57 @@
+from django.core.signing import Signer
+from django.test import SimpleTestCase
+from django.utils import timezone
+
+from anchor.support.signing import AnchorSigner, get_signer
+
+from . import benchmark, measure_rate, report
+
+
+class UncachedSigner(AnchorSigner):
+    signature = Signer.signature
+
+
+@benchmark
+class TestSigningBenchmark(SimpleTestCase):
+    def test_sign(self):
+        value = "blob-key-1234567890"
+
+        def sign_with_new_signer():
+            UncachedSigner().sign(value, purpose="file_system")
+
+        def sign_with_shared_signer():
+            get_signer().sign(value, purpose="file_system")
+
+        report(
+            "Signing",
+            before=measure_rate(sign_with_new_signer),
+            after=measure_rate(sign_with_shared_signer),
+        )
+
+    def test_unsign_variation_key(self):
+        value = {"format": "webp", "resize_to_limit": [300, 300]}
+        json_signer = AnchorSigner(format="json")
+        compact_signer = AnchorSigner(format="compact")
+        json_key = json_signer.sign(value, purpose="variation")
+        compact_key = compact_signer.sign(value, purpose="variation")
+
+        report(
+            f"Unsigning variation keys ({len(json_key)} vs {len(compact_key)} chars)",
+            json=measure_rate(lambda: json_signer.unsign(json_key, "variation")),
+            compact=measure_rate(
+                lambda: compact_signer.unsign(compact_key, "variation")
+            ),
+        )
+
+    def test_sign_many(self):
+        signer = get_signer()
+        keys = [f"blob-key-{i}" for i in range(1000)]
+        expires_in = timezone.timedelta(hours=1)
+
+        report(
+            "Signing 1000 blob IDs",
+            one_by_one=measure_rate(
+                lambda: [signer.sign(key, expires_in=expires_in) for key in keys]
+            ),
+            batch=measure_rate(lambda: signer.sign_many(keys, expires_in=expires_in)),
+        )
@@ -6,6 +6,10 @@ from anchor.models.fields import SingleAttachmentField
 class Dummy(models.Model):
     name = models.CharField(max_length=255)
     cover = SingleAttachmentField()
+    poster = SingleAttachmentField(
+        variants={"thumb": {"resize_to_limit": [100, 100]}},
+        eager_variants=["thumb"],
+    )
 
     def __str__(self) -> str:
         return f"{self.name} - {self.cover}"
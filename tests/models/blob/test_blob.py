@@ -1,17 +1,24 @@
+import asyncio
 import base64
 import os
 from io import BytesIO
 from unittest import skipUnless
+from unittest.mock import patch
 
 import requests
 from django.conf import settings
 from django.core.files import File
 from django.core.files.base import ContentFile
-from django.test import SimpleTestCase, TestCase
+from django.core.signing import BadSignature
+from django.db import IntegrityError
+from django.test import SimpleTestCase, TestCase, override_settings
 from django.utils import timezone
+from freezegun import freeze_time
 
 from anchor.models import Attachment, Blob
+from anchor.models.blob.blob import BlobQuerySet
 from anchor.settings import anchor_settings
+from anchor.templatetags.anchor import blob_url
 
 GARLIC_PNG = os.path.join(settings.BASE_DIR, "fixtures", "garlic.png")
 
@@ -22,6 +29,73 @@ class TestBlobSigning(TestCase):
         signed_id = blob.signed_id
         self.assertEqual(blob, Blob.objects.get_signed(signed_id))
 
+    def test_signed_id_is_computed_once(self):
+        blob = Blob(key="a-key")
+        with patch.object(Blob, "get_signed_id", return_value="signed") as sign:
+            self.assertEqual(blob.signed_id, "signed")
+            self.assertEqual(blob.signed_id, "signed")
+            sign.assert_called_once()
+
+            blob.key = "another-key"
+            blob.signed_id
+            self.assertEqual(sign.call_count, 2)
+
+    def test_signed_ids(self):
+        blobs = [Blob.objects.create(filename=f"{i}.txt") for i in range(3)]
+        signed_ids = Blob.objects.signed_ids(blobs)
+
+        self.assertEqual(len(signed_ids), 3)
+        for blob, signed_id in zip(blobs, signed_ids):
+            self.assertEqual(blob.signed_id, signed_id)
+            self.assertEqual(Blob.objects.get_signed(signed_id), blob)
+
+    def test_signed_ids_with_purpose(self):
+        blobs = [Blob.objects.create(filename=f"{i}.txt") for i in range(3)]
+        signed_ids = Blob.objects.signed_ids(blobs, purpose="test")
+
+        for blob, signed_id in zip(blobs, signed_ids):
+            self.assertEqual(Blob.objects.get_signed(signed_id, purpose="test"), blob)
+            # Only default signed IDs are attached to the blobs
+            self.assertNotEqual(blob.signed_id, signed_id)
+            self.assertEqual(Blob.objects.get_signed(blob.signed_id), blob)
+
+    def test_signed_ids_of_queryset(self):
+        for i in range(3):
+            Blob.objects.create(filename=f"{i}.txt")
+
+        with self.assertNumQueries(1):
+            signed_ids = Blob.objects.signed_ids()
+        self.assertEqual(
+            {Blob.objects.get_signed(signed_id).filename for signed_id in signed_ids},
+            {"0.txt", "1.txt", "2.txt"},
+        )
+
+    def test_signed_ids_share_expiration(self):
+        blobs = [Blob.objects.create(filename=f"{i}.txt") for i in range(2)]
+        signed_ids = Blob.objects.signed_ids(
+            blobs, expires_in=timezone.timedelta(minutes=1)
+        )
+
+        with freeze_time(timezone.now() + timezone.timedelta(minutes=2)):
+            for signed_id in signed_ids:
+                with self.assertRaises(BadSignature):
+                    Blob.objects.get_signed(signed_id)
+            # An expiring signed ID is not reused for the blob URLs
+            for blob in blobs:
+                self.assertEqual(Blob.objects.get_signed(blob.signed_id), blob)
+
+    def test_signed_ids_of_attachments(self):
+        blob = Blob.objects.create(filename="test.txt")
+        attachment = Attachment(blob=blob)
+        (signed_id,) = Blob.objects.signed_ids([attachment])
+        self.assertEqual(attachment.signed_id, signed_id)
+
+    def test_urls_for(self):
+        blobs = [Blob.objects.create(filename=f"{i}.txt") for i in range(2)]
+        urls = Blob.objects.urls_for(blobs)
+        self.assertEqual(urls, [blob_url(blob) for blob in blobs])
+        self.assertTrue(urls[0].endswith("/0.txt"))
+
 
 class TestBlobUnfurling(SimpleTestCase):
     def setUp(self):
@@ -76,6 +150,25 @@ class TestBlobUnfurling(SimpleTestCase):
         blob.unfurl(ContentFile("test"))
         self.assertEqual(blob.checksum, "CY9rzUYh03PK3k6DJie09g==")
 
+    def test_mime_type_is_sniffed_if_extension_is_unknown(self):
+        blob = Blob()
+        with open(GARLIC_PNG, mode="rb") as f:
+            blob.unfurl(File(f, name="garlic"))
+        self.assertEqual(blob.mime_type, "image/png")
+
+    def test_checksum_algorithm_defaults_to_md5(self):
+        self.assertEqual(self.blob.checksum_algorithm, "md5")
+
+    @override_settings(ANCHOR={"CHECKSUM_ALGORITHM": "sha256"})
+    def test_checksum_algorithm_is_configurable(self):
+        blob = Blob()
+        blob.unfurl(ContentFile(b"test"))
+        self.assertEqual(blob.checksum_algorithm, "sha256")
+        self.assertEqual(
+            blob.checksum,
+            "sha256:n4bQgYhMfWWaL-qgxVrQFaO_TxsrC4Is0V1sFbDwCgg=",
+        )
+
     def test_non_django_file_is_unfurled(self):
         blob = Blob()
         blob.unfurl(BytesIO(b"test"))
@@ -120,6 +213,31 @@ class TestBlobsBehaveLikeFiles(TestCase):
         self.assertIsNotNone(blob.key)
         self.assertTrue(blob.storage.exists(blob.key))
 
+    def test_upload_reads_file_once(self):
+        class CountingBytesIO(BytesIO):
+            bytes_read = 0
+
+            def read(self, *args):
+                data = super().read(*args)
+                self.bytes_read += len(data)
+                return data
+
+        with open(GARLIC_PNG, mode="rb") as f:
+            source = CountingBytesIO(f.read())
+
+        blob = Blob()
+        blob.upload(File(source, name="garlic.png"))
+        self.assertEqual(source.bytes_read, 8707)
+        self.assertEqual(blob.byte_size, 8707)
+        self.assertEqual(
+            blob.checksum,
+            base64.urlsafe_b64encode(
+                bytes.fromhex("bbbe32bf3967a22cc4ea0b885f6139ab")
+            ).decode("utf-8"),
+        )
+        with blob.open() as f:
+            self.assertEqual(len(f.read()), 8707)
+
     def test_open(self):
         blob = Blob()
         blob.upload(ContentFile(b"test", name="test.txt"))
@@ -238,6 +356,33 @@ class TestBlobQuerySet(TestCase):
         self.assertIsNotNone(blob.key)
         self.assertIsNotNone(blob.created_at)
 
+    def test_create_with_file_inserts_once(self):
+        with self.assertNumQueries(1):
+            blob = Blob.objects.create(file=ContentFile(b"test", name="test.txt"))
+
+        blob.refresh_from_db()
+        self.assertEqual(blob.byte_size, 4)
+        self.assertIsNotNone(blob.checksum)
+
+    def test_create_deletes_uploaded_file_if_insert_fails(self):
+        uploaded = []
+        upload = Blob.upload
+
+        def tracking_upload(blob, file):
+            upload(blob, file)
+            uploaded.append(blob)
+
+        with (
+            patch.object(Blob, "upload", autospec=True, side_effect=tracking_upload),
+            patch.object(Blob, "save", side_effect=IntegrityError),
+            self.assertRaises(IntegrityError),
+        ):
+            Blob.objects.create(file=ContentFile(b"test", name="test.txt"))
+
+        self.assertEqual(len(uploaded), 1)
+        self.assertFalse(uploaded[0].storage.exists(uploaded[0].key))
+        self.assertEqual(Blob.objects.count(), 0)
+
     def test_create_from_path(self):
         path = os.path.join(settings.BASE_DIR, "fixtures", "garlic.png")
         blob = Blob.objects.from_path(path)
@@ -266,3 +411,212 @@ class TestBlobCustomMetadata(SimpleTestCase):
         blob.custom_metadata = {"test": "world"}
         self.assertEqual(blob.metadata["test"], "hello")
         self.assertEqual(blob.custom_metadata["test"], "world")
+
+
+@override_settings(ANCHOR={"DEDUPLICATE_BLOBS": True, "CHECKSUM_ALGORITHM": "sha256"})
+class TestBlobDeduplication(TestCase):
+    def test_identical_files_share_storage(self):
+        first = Blob.objects.create(file=ContentFile(b"test", name="a.txt"))
+        second = Blob.objects.create(file=ContentFile(b"test", name="b.txt"))
+        self.assertNotEqual(first.pk, second.pk)
+        self.assertNotEqual(first.key, second.key)
+        self.assertIsNone(first.shared_key)
+        self.assertEqual(second.storage_key, first.key)
+        self.assertEqual(second.filename, "b.txt")
+        self.assertEqual(second.checksum, first.checksum)
+
+    def test_different_files_are_not_deduplicated(self):
+        Blob.objects.create(file=ContentFile(b"test", name="a.txt"))
+        blob = Blob.objects.create(file=ContentFile(b"other", name="a.txt"))
+        self.assertIsNone(blob.shared_key)
+
+    def test_files_are_not_deduplicated_across_backends(self):
+        first = Blob.objects.create(file=ContentFile(b"test", name="a.txt"))
+        second = Blob(backend="documents", checksum=first.checksum, byte_size=4)
+        self.assertIsNone(second.find_duplicate())
+
+    def test_file_is_deleted_when_last_reference_is_purged(self):
+        first = Blob.objects.create(file=ContentFile(b"test", name="a.txt"))
+        second = Blob.objects.create(file=ContentFile(b"test", name="b.txt"))
+
+        first.purge()
+        self.assertTrue(second.storage.exists(second.storage_key))
+        with second.open() as f:
+            self.assertEqual(f.read(), b"test")
+
+        second.purge()
+        self.assertFalse(second.storage.exists(second.storage_key))
+
+    def test_file_is_kept_when_a_duplicate_is_purged(self):
+        first = Blob.objects.create(file=ContentFile(b"test", name="a.txt"))
+        second = Blob.objects.create(file=ContentFile(b"test", name="b.txt"))
+        third = Blob.objects.create(file=ContentFile(b"test", name="c.txt"))
+        self.assertEqual(third.storage_key, first.key)
+
+        second.purge()
+        first.purge()
+        with third.open() as f:
+            self.assertEqual(f.read(), b"test")
+
+    def test_signed_ids_resolve_to_each_blob(self):
+        first = Blob.objects.create(file=ContentFile(b"test", name="a.txt"))
+        second = Blob.objects.create(file=ContentFile(b"test", name="b.txt"))
+        self.assertEqual(Blob.objects.get_signed(first.signed_id), first)
+        second = Blob.objects.get_signed(second.signed_id)
+        self.assertEqual(second.filename, "b.txt")
+        self.assertEqual(second.storage_key, first.key)
+
+    def test_variants_are_not_shared(self):
+        with open(GARLIC_PNG, "rb") as file:
+            first = Blob.objects.create(file=file)
+        with open(GARLIC_PNG, "rb") as file:
+            second = Blob.objects.create(file=file)
+        self.assertEqual(second.storage_key, first.key)
+
+        transformations = {"format": "webp", "resize_to_limit": [10, 10]}
+        first_variant = first.variant(transformations).processed
+        second_variant = second.variant(transformations).processed
+        self.assertNotEqual(first_variant.key, second_variant.key)
+
+        second_variant.delete()
+        self.assertTrue(first_variant.storage.exists(first_variant.key))
+
+    def test_variant_images_are_not_reused(self):
+        with open(GARLIC_PNG, "rb") as file:
+            original = Blob.objects.create(file=file)
+        variant = original.variant({"format": "png", "resize_to_limit": [10, 10]})
+        variant = variant.processed
+        with variant.storage.open(variant.key) as f:
+            content = f.read()
+
+        blob = Blob.objects.create(file=ContentFile(content, name="copy.png"))
+        self.assertIsNone(blob.shared_key)
+
+        variant.delete()
+        with blob.open() as f:
+            self.assertEqual(f.read(), content)
+
+    @override_settings(ANCHOR={"DEDUPLICATE_BLOBS": False})
+    def test_deduplication_is_opt_in(self):
+        first = Blob.objects.create(file=ContentFile(b"test", name="a.txt"))
+        second = Blob.objects.create(file=ContentFile(b"test", name="b.txt"))
+        self.assertNotEqual(first.key, second.key)
+
+
+class TestBlobBulkCreate(TestCase):
+    def test_bulk_create_from_paths(self):
+        onions = os.path.join(settings.BASE_DIR, "fixtures", "onions.jpg")
+        results = Blob.objects.bulk_create_from_files([GARLIC_PNG, onions], workers=2)
+        self.assertEqual([r.source for r in results], [GARLIC_PNG, onions])
+        self.assertTrue(all(r.ok for r in results))
+        self.assertEqual(Blob.objects.count(), 2)
+
+        garlic = Blob.objects.get(pk=results[0].blob.pk)
+        self.assertEqual(garlic.filename, "garlic.png")
+        self.assertEqual(garlic.byte_size, 8707)
+        self.assertEqual(garlic.mime_type, "image/png")
+        self.assertTrue(garlic.storage.exists(garlic.key))
+
+    def test_bulk_create_from_files(self):
+        files = (ContentFile(f"file {i}", name=f"{i}.txt") for i in range(20))
+        # One INSERT per batch, each wrapped in a savepoint
+        with self.assertNumQueries(6):
+            results = Blob.objects.bulk_create_from_files(
+                files, workers=3, batch_size=10
+            )
+        self.assertEqual(len(results), 20)
+        self.assertEqual([r.blob.filename for r in results][:2], ["0.txt", "1.txt"])
+        self.assertEqual(Blob.objects.count(), 20)
+
+    def test_errors_are_reported_per_item(self):
+        missing = os.path.join(settings.BASE_DIR, "fixtures", "missing.png")
+        results = Blob.objects.bulk_create_from_files([GARLIC_PNG, missing])
+        self.assertTrue(results[0].ok)
+        self.assertFalse(results[1].ok)
+        self.assertIsInstance(results[1].error, FileNotFoundError)
+        self.assertIsNone(results[1].blob)
+        self.assertEqual(Blob.objects.count(), 1)
+
+    def test_failed_inserts_are_reported_per_item(self):
+        save = Blob.save
+
+        def failing_save(blob, *args, **kwargs):
+            if blob.filename == "b.txt":
+                raise IntegrityError("Failing on purpose")
+            return save(blob, *args, **kwargs)
+
+        files = [ContentFile(b"a", name="a.txt"), ContentFile(b"b", name="b.txt")]
+        with (
+            patch.object(BlobQuerySet, "bulk_create", side_effect=IntegrityError),
+            patch.object(Blob, "save", autospec=True, side_effect=failing_save),
+        ):
+            results = Blob.objects.bulk_create_from_files(files)
+
+        self.assertTrue(results[0].ok)
+        self.assertIsInstance(results[1].error, IntegrityError)
+        self.assertListEqual(
+            list(Blob.objects.values_list("filename", flat=True)), ["a.txt"]
+        )
+
+    def test_blobs_cannot_share_a_key(self):
+        with self.assertRaises(ValueError):
+            Blob.objects.bulk_create_from_files([GARLIC_PNG], key="shared")
+
+
+class TestBlobAsync(TestCase):
+    async def test_acreate(self):
+        blob = await Blob.objects.acreate(file=ContentFile(b"test", name="test.txt"))
+        self.assertEqual(blob.filename, "test.txt")
+        self.assertEqual(blob.byte_size, 4)
+        self.assertEqual(await Blob.objects.acount(), 1)
+        self.assertTrue(blob.storage.exists(blob.key))
+
+    async def test_acreate_deletes_uploaded_file_if_insert_fails(self):
+        inserted = []
+        insert_uploaded = BlobQuerySet._insert_uploaded
+
+        def tracking_insert(queryset, blob, uploaded):
+            inserted.append(blob)
+            insert_uploaded(queryset, blob, uploaded)
+
+        with (
+            patch.object(
+                BlobQuerySet,
+                "_insert_uploaded",
+                autospec=True,
+                side_effect=tracking_insert,
+            ),
+            patch.object(Blob, "save", side_effect=IntegrityError),
+            self.assertRaises(IntegrityError),
+        ):
+            await Blob.objects.acreate(file=ContentFile(b"test", name="test.txt"))
+
+        self.assertEqual(len(inserted), 1)
+        self.assertFalse(inserted[0].storage.exists(inserted[0].key))
+        self.assertEqual(await Blob.objects.acount(), 0)
+
+    async def test_acreate_many_concurrently(self):
+        blobs = await asyncio.gather(
+            *(
+                Blob.objects.acreate(file=ContentFile(f"{i}", name=f"{i}.txt"))
+                for i in range(5)
+            )
+        )
+        self.assertEqual([b.filename for b in blobs], [f"{i}.txt" for i in range(5)])
+        self.assertEqual(await Blob.objects.acount(), 5)
+
+    async def test_aupload_and_aopen(self):
+        blob = Blob()
+        await blob.aupload(ContentFile(b"test", name="test.txt"))
+        with await blob.aopen() as f:
+            self.assertEqual(f.read(), b"test")
+
+    async def test_apurge(self):
+        blob = await Blob.objects.acreate(file=ContentFile(b"test", name="test.txt"))
+        await blob.apurge()
+        self.assertEqual(await Blob.objects.acount(), 0)
+        self.assertFalse(blob.storage.exists(blob.key))
+
+    async def test_aget_signed(self):
+        blob = await Blob.objects.acreate(filename="test.png")
+        self.assertEqual(await Blob.objects.aget_signed(blob.signed_id), blob)
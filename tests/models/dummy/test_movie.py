@@ -1,10 +1,12 @@
 import os
+from io import BytesIO
 
 from django.conf import settings
+from django.core.files.base import ContentFile
 from django.core.files.uploadedfile import UploadedFile
 from django.test import TestCase
 
-from anchor.models import Attachment, Blob
+from anchor.models import Attachment, Blob, VariantRecord
 from tests.dummy.models import Dummy
 
 
@@ -132,3 +134,57 @@ class TestDummy(TestCase):
             self.assertEqual(
                 dummies[1].cover.filename, os.path.basename(self.fixture_path)
             )
+
+    def test_eager_variants_are_generated_on_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.dummy.poster = Blob.objects.from_path(self.fixture_path)
+
+        variant = self.dummy.poster.representation("thumb")
+        self.assertFalse(variant.is_processed)
+
+        for callback in callbacks:
+            callback()
+        variant.refresh()
+        self.assertTrue(variant.is_processed)
+        self.assertEqual(VariantRecord.objects.count(), 1)
+
+    def test_eager_variants_of_broken_images_do_not_raise(self):
+        with (
+            self.assertLogs("anchor", level="ERROR"),
+            self.captureOnCommitCallbacks(execute=True),
+        ):
+            self.dummy.poster = ContentFile(b"not really a png", name="broken.png")
+        self.assertEqual(self.dummy.poster.filename, "broken.png")
+        self.assertEqual(VariantRecord.objects.count(), 0)
+
+    def test_prefetch_variants(self):
+        for i in range(3):
+            dummy = Dummy.objects.create(name=f"Prefetched {i}")
+            dummy.poster = Blob.objects.from_path(self.fixture_path)
+            if i == 0:
+                dummy.poster.representation("thumb").processed
+
+        dummies = list(
+            Dummy.objects.filter(name__startswith="Prefetched")
+            .order_by("name")
+            .prefetch_related("poster")
+        )
+        with self.assertNumQueries(2):
+            Blob.objects.prefetch_variants(
+                "thumb", objs=[dummy.poster for dummy in dummies]
+            )
+
+        with self.assertNumQueries(0):
+            variants = [dummy.poster.representation("thumb") for dummy in dummies]
+            self.assertEqual(
+                [variant.is_processed for variant in variants], [True, False, False]
+            )
+            self.assertEqual(variants[0].image().blob.mime_type, "image/webp")
+
+    def test_eager_variants_are_not_generated_for_other_files(self):
+        blob = Blob.objects.create(
+            file=UploadedFile(BytesIO(b"text"), name="a.txt"), filename="a.txt"
+        )
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.dummy.poster = blob
+        self.assertEqual(callbacks, [])
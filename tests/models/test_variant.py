@@ -1,6 +1,17 @@
-from django.test import TestCase
+import io
+from datetime import timedelta
+from unittest.mock import PropertyMock, patch
 
-from anchor.models import Blob, Variant
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from freezegun import freeze_time
+
+from anchor.models import Blob, Variant, VariantRecord
+from anchor.models.variant import RecentlyFailed
+from anchor.services.locks import FileLock
+from anchor.services.transformers import TransformationError
 
 
 class TestVariant(TestCase):
@@ -34,6 +45,100 @@ class TestVariant(TestCase):
         with v.process() as transformed:
             self.assertEqual(transformed.read(4), b"RIFF")
 
+    def test_filename(self):
+        v = Variant(self.blob, {"format": "webp"})
+        self.assertEqual(v.filename, "garlic.webp")
+
+    def test_processed_record(self):
+        v = self.blob.variant({"format": "webp", "resize_to_fit": [10, 20]})
+        image = v.processed.image().blob
+        self.assertEqual(image.filename, "garlic.webp")
+        self.assertEqual(image.mime_type, "image/webp")
+        with v.storage.open(v.key) as f:
+            self.assertEqual(image.byte_size, len(f.read()))
+
+    def test_record_is_looked_up_once(self):
+        transformations = {"format": "webp", "resize_to_fit": [10, 20]}
+        self.blob.variant(transformations).delete()
+        v = self.blob.variant(transformations)
+        with self.assertNumQueries(1):
+            self.assertFalse(v.is_processed)
+            self.assertIsNone(v.image())
+
+        with v.process():
+            pass
+        with self.assertNumQueries(0):
+            self.assertTrue(v.is_processed)
+
+        v.delete()
+        with self.assertNumQueries(0):
+            self.assertFalse(v.is_processed)
+
+    def test_refresh_discards_prefetched_record(self):
+        transformations = {"format": "webp", "resize_to_fit": [12, 12]}
+        [blob] = Blob.objects.filter(pk=self.blob.pk).prefetch_variants(transformations)
+        v = blob.variant(transformations)
+        self.assertFalse(v.is_processed)
+
+        Blob.objects.get(pk=self.blob.pk).variant(transformations).processed
+        self.assertFalse(v.is_processed)
+        v.refresh()
+        self.assertTrue(v.is_processed)
+
+    @override_settings(
+        ANCHOR={"VARIANT_LOCK_BACKEND": "anchor.services.locks.FileLock"}
+    )
+    def test_processed_checks_prefetched_record_again_after_waiting(self):
+        transformations = {"format": "webp", "resize_to_fit": [14, 14]}
+        [blob] = Blob.objects.filter(pk=self.blob.pk).prefetch_variants(transformations)
+        v = blob.variant(transformations)
+        self.assertFalse(v.is_processed)
+
+        Blob.objects.get(pk=self.blob.pk).variant(transformations).processed
+        with patch.object(Blob, "open") as blob_open:
+            v.processed
+        blob_open.assert_not_called()
+        self.assertEqual(VariantRecord.objects.filter(blob=self.blob).count(), 1)
+
+    def test_record_query_budget(self):
+        v = self.blob.variant({"format": "webp", "resize_to_limit": [15, 15]})
+        self.assertFalse(v.is_processed)
+        ContentType.objects.get_for_model(VariantRecord)
+
+        # Savepoint, blob, record, attachment, release
+        with self.assertNumQueries(5):
+            record = v.get_or_create_record(io.BytesIO(b"image"))
+
+        with self.assertNumQueries(0):
+            self.assertEqual(record.image.blob.key, v.key)
+        self.assertEqual(record.image.blob.backend, self.blob.backend)
+        self.assertEqual(v.record, record)
+        self.assertEqual(
+            VariantRecord.objects.get(
+                blob=self.blob, variation_digest=v.variation.digest
+            ).image.blob.byte_size,
+            5,
+        )
+
+    def test_record_is_replaced(self):
+        v = self.blob.variant({"format": "webp", "resize_to_limit": [16, 16]})
+        first = v.get_or_create_record(io.BytesIO(b"first"))
+        second = v.get_or_create_record(io.BytesIO(b"second"))
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(VariantRecord.objects.get(pk=first.pk).image.blob.byte_size, 6)
+
+    def test_record_inserted_concurrently_is_reused(self):
+        transformations = {"format": "webp", "resize_to_limit": [17, 17]}
+        v = self.blob.variant(transformations)
+        self.assertFalse(v.is_processed)
+
+        other = Blob.objects.get(pk=self.blob.pk).variant(transformations)
+        first = other.get_or_create_record(io.BytesIO(b"first"))
+        second = v.get_or_create_record(io.BytesIO(b"second"))
+        self.assertEqual(first.pk, second.pk)
+        self.assertEqual(VariantRecord.objects.filter(blob=self.blob).count(), 1)
+        self.assertEqual(VariantRecord.objects.get(pk=first.pk).image.blob.byte_size, 6)
+
     def test_is_processed(self):
         v = Variant(self.blob, {"format": "webp", "resize_to_fit": [10, 20]})
         self.assertFalse(v.is_processed)
@@ -53,3 +158,236 @@ class TestVariant(TestCase):
         self.assertEqual(v.processed, v)
         self.assertTrue(v.is_processed)
         self.assertTrue(v.processed.is_processed)
+
+    @override_settings(
+        ANCHOR={"VARIANT_LOCK_BACKEND": "anchor.services.locks.FileLock"}
+    )
+    def test_processed_with_lock(self):
+        v = Variant(self.blob, {"format": "webp", "resize_to_fit": [10, 20]})
+        v.delete()
+        with patch.object(FileLock, "lock", wraps=FileLock().lock) as lock:
+            self.assertTrue(v.processed.is_processed)
+            v.processed
+        lock.assert_called_once_with(v.key)
+
+    @override_settings(
+        ANCHOR={"VARIANT_LOCK_BACKEND": "anchor.services.locks.FileLock"}
+    )
+    def test_processed_checks_again_after_waiting(self):
+        v = Variant(self.blob, {"format": "webp", "resize_to_fit": [10, 20]})
+        with (
+            patch.object(Variant, "is_processed", side_effect=[False, True]),
+            patch.object(Variant, "process") as process,
+        ):
+            v.processed
+        process.assert_not_called()
+
+    def test_process_variants(self):
+        transformations = [{"resize_to_limit": [w, w]} for w in (10, 30, 20)]
+        for variant in map(self.blob.variant, transformations):
+            variant.delete()
+
+        with patch.object(self.blob, "open", wraps=self.blob.open) as blob_open:
+            variants = self.blob.process_variants(
+                [*transformations, transformations[0]]
+            )
+        blob_open.assert_called_once()
+
+        self.assertEqual(len(variants), 4)
+        for variant, t in zip(variants, transformations):
+            self.assertEqual(variant.variation.operations, t)
+            self.assertTrue(variant.is_processed)
+        self.assertEqual(VariantRecord.objects.filter(blob=self.blob).count(), 3)
+
+    def test_process_variants_skips_processed_variants(self):
+        v = self.blob.variant({"resize_to_limit": [10, 10]}).processed
+        with patch.object(Blob, "open") as blob_open:
+            self.assertEqual(
+                self.blob.process_variants([{"resize_to_limit": [10, 10]}])[0].key,
+                v.key,
+            )
+        blob_open.assert_not_called()
+
+    @override_settings(
+        ANCHOR={"VARIANT_LOCK_BACKEND": "anchor.services.locks.FileLock"}
+    )
+    def test_process_variants_with_lock(self):
+        transformations = [{"resize_to_limit": [w, w]} for w in (11, 12)]
+        variants = [self.blob.variant(t) for t in transformations]
+        for variant in variants:
+            variant.delete()
+
+        with patch.object(FileLock, "lock", wraps=FileLock().lock) as lock:
+            self.blob.process_variants(transformations)
+        self.assertEqual(
+            sorted(call.args[0] for call in lock.call_args_list),
+            sorted(variant.key for variant in variants),
+        )
+
+    @override_settings(
+        ANCHOR={"VARIANT_LOCK_BACKEND": "anchor.services.locks.FileLock"}
+    )
+    def test_process_variants_checks_again_after_waiting(self):
+        with (
+            patch.object(
+                self.blob.variant_class,
+                "is_processed",
+                new_callable=PropertyMock,
+                side_effect=[False, True],
+            ),
+            patch.object(Blob, "open") as blob_open,
+        ):
+            self.blob.process_variants([{"resize_to_limit": [13, 13]}])
+        blob_open.assert_not_called()
+
+
+class TestVariantExistence(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        with open("tests/fixtures/garlic.png", mode="rb") as file:
+            cls.blob = Blob.objects.create(file=file)
+
+    def setUp(self):
+        cache.clear()
+        self.variant = Variant(self.blob, {"format": "webp", "rotate": [45]})
+        self.variant.delete()
+
+    def test_processed_keys_are_remembered(self):
+        with self.variant.process():
+            pass
+
+        with patch.object(type(self.blob.storage), "exists") as exists:
+            self.assertTrue(Variant(self.blob, self.variant.variation).is_processed)
+        exists.assert_not_called()
+
+    def test_existing_keys_are_remembered(self):
+        with self.variant.process():
+            pass
+        Variant._processed_keys.clear()
+
+        self.assertTrue(self.variant.is_processed)
+        with patch.object(type(self.blob.storage), "exists") as exists:
+            self.assertTrue(self.variant.is_processed)
+        exists.assert_not_called()
+
+    def test_processed_keys_expire(self):
+        with freeze_time("2026-01-01 12:00:00"):
+            with self.variant.process():
+                pass
+        self.variant.storage.delete(self.variant.key)
+
+        with freeze_time("2026-01-01 12:00:59"):
+            self.assertTrue(self.variant.is_processed)
+        with freeze_time("2026-01-01 12:01:01"):
+            self.assertFalse(self.variant.is_processed)
+
+    @override_settings(ANCHOR={"VARIANT_EXISTENCE_MAX_AGE": timedelta(0)})
+    def test_processed_keys_are_not_remembered(self):
+        with self.variant.process():
+            pass
+        with patch.object(type(self.blob.storage), "exists") as exists:
+            self.variant.is_processed
+        exists.assert_called_once()
+
+    def test_processed_keys_are_cleared_when_settings_change(self):
+        with self.variant.process():
+            pass
+        self.variant.storage.delete(self.variant.key)
+
+        with override_settings(STORAGES=settings.STORAGES):
+            self.assertFalse(self.variant.is_processed)
+
+    def test_delete_forgets_keys(self):
+        with self.variant.process():
+            pass
+        self.variant.delete()
+        self.assertFalse(self.variant.is_processed)
+
+    @override_settings(ANCHOR={"VARIANT_EXISTENCE_CACHE": "default"})
+    def test_shared_cache(self):
+        with self.variant.process():
+            pass
+        # As seen from another process
+        Variant._processed_keys.clear()
+
+        with patch.object(type(self.blob.storage), "exists") as exists:
+            self.assertTrue(self.variant.is_processed)
+        exists.assert_not_called()
+
+        self.variant.delete()
+        self.assertIsNone(cache.get(self.variant._existence_key))
+
+
+@override_settings(
+    ANCHOR={
+        "VARIANT_FAILURE_CACHE": "default",
+        "IMAGE_PROCESSOR_OPTIONS": {"max_pixels": 10},
+    }
+)
+class TestVariantFailures(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        with open("tests/fixtures/garlic.png", mode="rb") as file:
+            cls.blob = Blob.objects.create(file=file)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_failures_are_remembered(self):
+        v = self.blob.variant({"format": "webp"})
+        with freeze_time("2026-01-01 12:00:00"):
+            with self.assertRaises(TransformationError) as context:
+                v.processed
+            self.assertNotIsInstance(context.exception, RecentlyFailed)
+
+        with (
+            freeze_time("2026-01-01 12:00:30"),
+            patch.object(self.blob, "open") as blob_open,
+            self.assertNumQueries(0),
+        ):
+            with self.assertRaises(RecentlyFailed) as context:
+                self.blob.variant({"format": "webp"}).processed
+        blob_open.assert_not_called()
+        self.assertEqual(context.exception.retry_after, 31)
+
+    def test_backoff_doubles(self):
+        v = self.blob.variant({"format": "webp"})
+        with freeze_time("2026-01-01 12:00:00"), self.assertRaises(TransformationError):
+            v.processed
+        with freeze_time("2026-01-01 12:01:01"), self.assertRaises(TransformationError):
+            v.processed
+        with freeze_time("2026-01-01 12:03:00"), self.assertRaises(RecentlyFailed):
+            v.processed
+        with (
+            freeze_time("2026-01-01 12:03:02"),
+            self.assertRaises(TransformationError) as context,
+        ):
+            v.processed
+        self.assertNotIsInstance(context.exception, RecentlyFailed)
+
+    def test_process_variants_remembers_failures(self):
+        transformations = [{"format": "webp"}, {"format": "png"}]
+        with freeze_time("2026-01-01 12:00:00"), self.assertRaises(TransformationError):
+            self.blob.process_variants(transformations)
+
+        with (
+            freeze_time("2026-01-01 12:00:30"),
+            patch.object(Blob, "open") as blob_open,
+        ):
+            with self.assertRaises(RecentlyFailed):
+                self.blob.process_variants(transformations)
+            with self.assertRaises(RecentlyFailed):
+                self.blob.variant({"format": "png"}).processed
+        blob_open.assert_not_called()
+
+    def test_success_clears_failures(self):
+        v = self.blob.variant({"format": "webp"})
+        with freeze_time("2026-01-01 12:00:00"), self.assertRaises(TransformationError):
+            v.processed
+
+        with (
+            freeze_time("2026-01-01 12:01:01"),
+            override_settings(ANCHOR={"VARIANT_FAILURE_CACHE": "default"}),
+        ):
+            self.assertTrue(v.processed.is_processed)
+        self.assertIsNone(cache.get(v._failure_key))
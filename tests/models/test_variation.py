@@ -1,8 +1,13 @@
+import hashlib
+from unittest.mock import patch
+
+from django.core.signing import BadSignature
 from django.test import SimpleTestCase, override_settings
 
 from anchor.models.variation import Variation
 from anchor.services.transformers.image import ImageTransformer
 from anchor.settings import anchor_settings
+from anchor.support.signing import AnchorSigner
 
 
 class TestVariation(SimpleTestCase):
@@ -28,13 +33,39 @@ class TestVariation(SimpleTestCase):
         key = Variation.encode(transformations)
         self.assertEqual(Variation.decode(key).transformations, transformations)
 
-    def test_transformation_order_matters_for_digests(self):
+    def test_transformations_are_canonicalized(self):
+        v = Variation(
+            {"crop": {"width": 10, "height": 20}, "format": "png", "resize": (1, 2)}
+        )
+        self.assertEqual(list(v.transformations), ["format", "crop", "resize"])
+        self.assertEqual(list(v.transformations["crop"]), ["height", "width"])
+        self.assertEqual(v.transformations["resize"], [1, 2])
+
+    def test_format_position_does_not_matter_for_digests(self):
         t1 = {"format": "png", "resize_to_fit": [100, 200]}
         d1 = Variation(t1).digest
 
-        t2 = {"resize_to_fit": [100, 200], "format": "png"}
+        t2 = {"resize_to_fit": (100, 200), "format": "png"}
         d2 = Variation(t2).digest
-        self.assertNotEqual(d1, d2)
+        self.assertEqual(d1, d2)
+
+    def test_operation_order_matters_for_digests(self):
+        t1 = {"rotate": [90], "resize_to_fit": [100, 200]}
+        t2 = {"resize_to_fit": [100, 200], "rotate": [90]}
+        self.assertNotEqual(Variation(t1).digest, Variation(t2).digest)
+
+    def test_digest_is_memoized(self):
+        v = Variation({"format": "png"})
+        with patch("anchor.models.variation.hashlib.sha1", wraps=hashlib.sha1) as sha1:
+            self.assertEqual(v.digest, v.digest)
+        sha1.assert_called_once()
+
+    def test_memo_is_reset_when_transformations_change(self):
+        v = Variation({"format": "png"})
+        digest, key = v.digest, v.key
+        v.default_to({"resize_to_fit": [100, 200]})
+        self.assertNotEqual(v.digest, digest)
+        self.assertNotEqual(v.key, key)
 
     def test_digest_length(self):
         self.assertEqual(len(Variation({}).digest), 28)
@@ -47,14 +78,86 @@ class TestVariation(SimpleTestCase):
 
         self.assertEqual(k1, expected_k1)
 
-    def test_transformation_order_matters_for_keys(self):
+    def test_format_position_does_not_matter_for_keys(self):
         t1 = {"format": "png", "resize_to_fit": [100, 200]}
         k1 = Variation(t1).key
 
         t2 = {"resize_to_fit": [100, 200], "format": "png"}
         k2 = Variation(t2).key
 
-        self.assertNotEqual(k1, k2)
+        self.assertEqual(k1, k2)
+        self.assertEqual(Variation.encode(t2), k1)
+
+    def test_key_is_memoized(self):
+        v = Variation({"format": "png"})
+        with patch.object(AnchorSigner, "sign", autospec=True) as sign:
+            sign.return_value = "key"
+            self.assertEqual(v.key, v.key)
+        sign.assert_called_once()
+
+    def test_key_digest_does_not_depend_on_signing_format(self):
+        v = Variation({"format": "png"})
+        with override_settings(ANCHOR={"SIGNING_FORMAT": "compact"}):
+            compact_key, compact_digest = v.key, v.key_digest
+        self.assertNotEqual(v.key, compact_key)
+        self.assertEqual(v.key_digest, compact_digest)
+
+    def test_decode_is_memoized(self):
+        key = Variation.encode({"format": "png"})
+        Variation.decode(key)
+        with patch.object(AnchorSigner, "unsign", autospec=True) as unsign:
+            self.assertEqual(Variation.decode(key).transformations, {"format": "png"})
+        unsign.assert_not_called()
+
+    def test_decode_checks_signature_with_new_secret_key(self):
+        key = Variation.encode({"format": "png"})
+        Variation.decode(key)
+        with (
+            override_settings(SECRET_KEY="another-key"),
+            self.assertRaises(BadSignature),
+        ):
+            Variation.decode(key)
+
+    def test_register_preset(self):
+        digest = Variation.register_preset({"resize_to_fit": (10, 10)})
+        self.assertEqual(digest, Variation({"resize_to_fit": [10, 10]}).digest)
+
+        v = Variation.wrap(digest)
+        self.assertEqual(v.transformations, {"resize_to_fit": [10, 10]})
+        self.assertEqual(v.preset, digest)
+        self.assertEqual(v.url_key, digest)
+
+    def test_preset_is_kept_after_default_to(self):
+        digest = Variation.register_preset({"resize_to_fit": [10, 10]})
+        v = Variation.from_preset(digest)
+        v.default_to({"format": "webp"})
+        self.assertEqual(v.url_key, digest)
+
+        v.transformations = {"format": "png"}
+        self.assertIsNone(v.preset)
+        self.assertEqual(v.url_key, v.key)
+
+    @override_settings(ANCHOR={"VARIANTS": {"small": {"resize_to_fit": [5, 5]}}})
+    def test_wrap_global_preset(self):
+        v = Variation.wrap("small")
+        self.assertEqual(v.transformations, {"resize_to_fit": [5, 5]})
+        self.assertEqual(Variation.wrap(v.url_key).transformations, v.transformations)
+
+    @override_settings(ANCHOR={"VARIANTS": {"small": {"resize_to_fit": [6, 6]}}})
+    def test_global_presets_are_registered_once(self):
+        with patch.object(
+            Variation, "register_preset", wraps=Variation.register_preset
+        ) as register_preset:
+            Variation.wrap("small")
+            Variation.wrap("small")
+        register_preset.assert_called_once_with({"resize_to_fit": [6, 6]})
+
+        with override_settings(ANCHOR={"VARIANTS": {"small": {"rotate": [90]}}}):
+            self.assertEqual(Variation.wrap("small").transformations, {"rotate": [90]})
+
+    def test_unregistered_digests_are_rejected(self):
+        with self.assertRaises(BadSignature):
+            Variation.wrap(Variation({"resize_to_fit": [1, 1]}).digest)
 
     def test_transformer(self):
         v = Variation({})
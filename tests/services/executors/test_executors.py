@@ -0,0 +1,160 @@
+import io
+import os
+import sys
+import time
+import unittest
+from unittest.mock import Mock
+
+from django.test import SimpleTestCase, override_settings
+from PIL import Image
+
+from anchor.services.executors import (
+    InlineExecutor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    get_variant_executor,
+)
+from anchor.services.transformers import (
+    BaseTransformer,
+    ImageTransformer,
+    TransformationError,
+)
+
+
+def fail():
+    raise ValueError("failed")
+
+
+class TestInlineExecutor(SimpleTestCase):
+    def test_submit(self):
+        fn = Mock()
+        InlineExecutor().submit(fn, "a", "b")
+        fn.assert_called_once_with("a", "b")
+
+    def test_errors_are_logged(self):
+        with self.assertLogs("anchor", level="ERROR"):
+            InlineExecutor().submit(fail)
+
+
+class TestThreadPoolExecutor(SimpleTestCase):
+    def test_submit(self):
+        fn = Mock()
+        ThreadPoolExecutor().submit(fn, "a").result()
+        fn.assert_called_once_with("a")
+
+    def test_errors_are_logged(self):
+        with self.assertLogs("anchor", level="ERROR"):
+            ThreadPoolExecutor().submit(fail).result()
+
+
+class PidTransformer(BaseTransformer):
+    def process(self, file, format):
+        return io.BytesIO(str(os.getpid()).encode())
+
+
+class SlowTransformer(BaseTransformer):
+    def process(self, file, format):
+        time.sleep(10)
+
+
+class CrashingTransformer(BaseTransformer):
+    def process(self, file, format):
+        os._exit(1)
+
+
+class GreedyTransformer(BaseTransformer):
+    def process(self, file, format):
+        return io.BytesIO(bytes(self.transformations["size"]))
+
+
+class QuickProcessPoolExecutor(ProcessPoolExecutor):
+    processes = 1
+    timeout = 1
+    max_jobs_per_process = 2
+
+
+def virtual_memory_size() -> int:
+    with open("/proc/self/status") as status:
+        return next(int(line.split()[1]) * 1024 for line in status if "VmSize" in line)
+
+
+class TestProcessPoolExecutor(SimpleTestCase):
+    def setUp(self):
+        self.executor = QuickProcessPoolExecutor()
+        self.image = open("tests/fixtures/garlic.png", mode="rb")
+
+    def tearDown(self):
+        self.image.close()
+        for worker in self.executor._idle:
+            worker.stop()
+
+    def test_transform(self):
+        transformer = ImageTransformer({"resize_to_fit": [10, 20]})
+        output = self.executor.transform(transformer, self.image, "webp")
+        with output:
+            self.assertLessEqual(Image.open(output).size, (10, 20))
+
+    def test_transform_many(self):
+        outputs = self.executor.transform_many(
+            ImageTransformer({}),
+            self.image,
+            [({"resize_to_fit": [10, 10]}, "png"), ({}, "webp")],
+        )
+        self.assertEqual([Image.open(o).format for o in outputs], ["PNG", "WEBP"])
+        for output in outputs:
+            output.close()
+
+    def test_transformation_errors(self):
+        with self.assertRaises(TransformationError):
+            self.executor.transform(ImageTransformer({}), io.BytesIO(b"x"), "png")
+
+    def test_workers_are_reused_and_recycled(self):
+        pids = [
+            self.executor.transform(PidTransformer({}), io.BytesIO(), "").read()
+            for _ in range(3)
+        ]
+        self.assertEqual(pids[0], pids[1])
+        self.assertNotEqual(pids[1], pids[2])
+        self.assertNotEqual(pids[0], str(os.getpid()).encode())
+
+    def test_timeout(self):
+        with self.assertRaisesMessage(TransformationError, "timed out"):
+            self.executor.transform(SlowTransformer({}), io.BytesIO(), "png")
+        self.assertEqual(self.executor._idle, [])
+
+        # The pool keeps working with a new worker
+        self.executor.transform(PidTransformer({}), io.BytesIO(), "")
+
+    def test_crash(self):
+        with self.assertRaisesMessage(TransformationError, "exited"):
+            self.executor.transform(CrashingTransformer({}), io.BytesIO(), "png")
+        self.executor.transform(PidTransformer({}), io.BytesIO(), "")
+
+    def test_max_pixels(self):
+        self.executor.max_pixels = 100
+        with self.assertRaisesMessage(TransformationError, "exceeds the limit"):
+            self.executor.transform(ImageTransformer({}), self.image, "png")
+
+    def test_start_method_defaults_to_spawn(self):
+        worker = self.executor._get_worker()
+        self.executor._release_worker(worker)
+        self.assertEqual(worker.process._start_method, "spawn")
+
+    @unittest.skipUnless(sys.platform == "linux", "Reads memory usage from /proc")
+    def test_memory_limit(self):
+        self.executor.memory_limit = virtual_memory_size() + 256 * 1024 * 1024
+        transformer = GreedyTransformer({"size": 512 * 1024 * 1024})
+        with self.assertRaises(TransformationError):
+            self.executor.transform(transformer, io.BytesIO(), "png")
+
+
+class TestGetVariantExecutor(SimpleTestCase):
+    def test_defaults_to_inline(self):
+        self.assertIsInstance(get_variant_executor(), InlineExecutor)
+
+    @override_settings(
+        ANCHOR={"VARIANT_EXECUTOR": "anchor.services.executors.ThreadPoolExecutor"}
+    )
+    def test_executors_are_shared(self):
+        self.assertIsInstance(get_variant_executor(), ThreadPoolExecutor)
+        self.assertIs(get_variant_executor(), get_variant_executor())
@@ -0,0 +1,41 @@
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from freezegun import freeze_time
+
+from anchor.models import Lock
+from anchor.services.locks import DatabaseLock, LockTimeout
+
+
+class TestDatabaseLock(TestCase):
+    def test_lock(self):
+        lock = DatabaseLock(timeout=0.1)
+        with lock.lock("a"):
+            self.assertTrue(Lock.objects.filter(name="a").exists())
+        self.assertFalse(Lock.objects.filter(name="a").exists())
+
+    def test_lock_is_exclusive(self):
+        lock = DatabaseLock(timeout=0.1)
+        with lock.lock("a"):
+            with self.assertRaises(LockTimeout), lock.lock("a"):
+                pass
+
+            # Other names are not affected
+            with lock.lock("b"):
+                pass
+
+    def test_expired_locks_are_taken_over(self):
+        lock = DatabaseLock(timeout=0.1, lease=10)
+        handle = lock.try_acquire("a")
+        self.assertIsNone(lock.try_acquire("a"))
+
+        with freeze_time(timezone.now() + timezone.timedelta(seconds=11)):
+            self.assertIsNotNone(lock.try_acquire("a"))
+
+        # Releasing a lock that was taken over does not release the new holder
+        lock.release(handle)
+        self.assertTrue(Lock.objects.filter(name="a").exists())
+
+    @override_settings(ANCHOR={"VARIANT_LOCK_DATABASE": "default"})
+    def test_database_can_be_configured(self):
+        self.assertEqual(DatabaseLock().using, "default")
+        self.assertEqual(DatabaseLock(using="other").using, "other")
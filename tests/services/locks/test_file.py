@@ -0,0 +1,56 @@
+import tempfile
+import threading
+
+from django.test import SimpleTestCase, override_settings
+
+from anchor.services.locks import FileLock, LockTimeout
+
+
+class TestFileLock(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_lock(self):
+        lock = FileLock(directory=self.directory.name, timeout=0.1)
+        with lock.lock("a"):
+            pass
+        with lock.lock("a"):
+            pass
+
+    def test_lock_is_exclusive(self):
+        lock = FileLock(directory=self.directory.name, timeout=0.1)
+        with lock.lock("a"):
+            with self.assertRaises(LockTimeout), lock.lock("a"):
+                pass
+
+            # Other names are not affected
+            with lock.lock("b"):
+                pass
+
+    def test_waiters_acquire_lock_once_released(self):
+        lock = FileLock(directory=self.directory.name, timeout=5)
+        acquired = threading.Event()
+        release = threading.Event()
+        order = []
+
+        def hold():
+            with lock.lock("a"):
+                acquired.set()
+                release.wait()
+                order.append("holder")
+
+        thread = threading.Thread(target=hold)
+        thread.start()
+        acquired.wait()
+        release.set()
+        with lock.lock("a"):
+            order.append("waiter")
+        thread.join()
+
+        self.assertEqual(order, ["holder", "waiter"])
+
+    def test_directory_defaults_to_setting(self):
+        with override_settings(ANCHOR={"VARIANT_LOCK_DIRECTORY": self.directory.name}):
+            lock = FileLock()
+        self.assertTrue(lock.path("a").startswith(self.directory.name))
@@ -34,3 +34,69 @@ class TestPillowProcessor(SimpleTestCase):
         processor.save(buff, format="png")
 
         self.assertLessEqual(Image.open(buff).size, (20, 30))
+
+    def test_copy(self):
+        processor = PillowProcessor()
+        processor.source(self.image)
+        size = processor.source.size
+
+        copy = processor.copy()
+        copy.resize_to_fit(20, 30)
+        self.assertLessEqual(copy.source.size, (20, 30))
+        self.assertEqual(processor.source.size, size)
+
+    def test_options(self):
+        processor = PillowProcessor(
+            resample="lanczos", reducing_gap=None, save_options={"webp": {"quality": 5}}
+        )
+        self.assertEqual(processor.resample, Image.Resampling.LANCZOS)
+        processor.source(self.image)
+
+        low, high = io.BytesIO(), io.BytesIO()
+        processor.save(low, format="webp")
+        PillowProcessor().source(self.image).save(high, format="webp")
+        self.assertLess(low.getbuffer().nbytes, high.getbuffer().nbytes)
+
+
+class TestPillowProcessorDraft(SimpleTestCase):
+    def setUp(self):
+        self.image = io.BytesIO()
+        Image.new("RGB", (1600, 1200), "red").save(self.image, format="jpeg")
+        self.image.seek(0)
+
+    def test_plan_decodes_at_reduced_size(self):
+        processor = PillowProcessor().source(self.image)
+        processor.plan([{"resize_to_limit": [100, 100]}])
+        self.assertEqual(processor.source.size, (400, 300))
+
+        processor.resize_to_limit(100, 100)
+        self.assertEqual(processor.source.size, (100, 75))
+
+    def test_plan_keeps_the_largest_output_sharp(self):
+        processor = PillowProcessor().source(self.image)
+        processor.plan([{"resize_to_limit": [100, 100]}, {"resize_to_fit": [300, 300]}])
+        self.assertEqual(processor.source.size, (800, 600))
+
+    def test_plan_with_other_operations_first(self):
+        processor = PillowProcessor().source(self.image)
+        processor.plan(
+            [{"resize_to_limit": [100, 100]}, {"rotate": 90, "resize_to_fit": [1, 1]}]
+        )
+        self.assertEqual(processor.source.size, (1600, 1200))
+
+    def test_plan_disabled(self):
+        processor = PillowProcessor(draft=False).source(self.image)
+        processor.plan([{"resize_to_limit": [100, 100]}])
+        self.assertEqual(processor.source.size, (1600, 1200))
+
+    def test_plan_on_png(self):
+        with open("tests/fixtures/garlic.png", mode="rb") as f:
+            processor = PillowProcessor().source(f)
+            size = processor.source.size
+            processor.plan([{"resize_to_limit": [10, 10]}])
+            self.assertEqual(processor.source.size, size)
+
+    def test_max_pixels(self):
+        with self.assertRaises(Image.DecompressionBombError):
+            PillowProcessor(max_pixels=100).source(self.image)
+        PillowProcessor(max_pixels=1600 * 1200).source(self.image)
@@ -1,4 +1,6 @@
-from django.test import SimpleTestCase
+import tempfile
+
+from django.test import SimpleTestCase, override_settings
 
 from anchor.services.transformers.base import BaseTransformer
 
@@ -12,3 +14,23 @@ class TestBaseTransformer(SimpleTestCase):
         transformer = BaseTransformer({"resize_to_fit": (100, 100)})
         with self.assertRaises(NotImplementedError):
             transformer.process(None, None)
+
+    def test_temporary_file_is_spooled(self):
+        transformer = BaseTransformer({})
+        with transformer._get_temporary_file("png") as temp:
+            self.assertIsInstance(temp, tempfile.SpooledTemporaryFile)
+            temp.write(b"small")
+            self.assertFalse(temp._rolled)
+
+    @override_settings(ANCHOR={"VARIANT_SPOOL_MAX_SIZE": 4})
+    def test_temporary_file_rolls_over(self):
+        transformer = BaseTransformer({})
+        with transformer._get_temporary_file("png") as temp:
+            temp.write(b"too large")
+            self.assertTrue(temp._rolled)
+
+    @override_settings(ANCHOR={"VARIANT_SPOOL_MAX_SIZE": 0})
+    def test_temporary_file_on_disk(self):
+        transformer = BaseTransformer({})
+        with transformer._get_temporary_file("png") as temp:
+            self.assertTrue(temp.name.endswith(".png"))
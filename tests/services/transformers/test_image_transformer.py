@@ -1,4 +1,7 @@
-from django.test import SimpleTestCase
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, override_settings
+from PIL import Image
 
 from anchor.services.processors.base import BaseProcessor
 from anchor.services.transformers.image import ImageTransformer
@@ -19,6 +22,26 @@ class DummyProcessor(BaseProcessor):
         return self
 
 
+class CopyingProcessor(BaseProcessor):
+    saved = []
+
+    def __init__(self, parent=None):
+        self.parent = parent
+        self.box = None
+
+    def source(self, *args, **kwargs):
+        CopyingProcessor.saved = []
+
+    def copy(self):
+        return CopyingProcessor(parent=self)
+
+    def resize_to_limit(self, width, height):
+        self.box = [width, height]
+
+    def save(self, *args, **kwargs):
+        CopyingProcessor.saved.append((self.box, self.parent.box))
+
+
 class TestImageTransformer(SimpleTestCase):
     def setUp(self):
         self.image = open("tests/fixtures/garlic.png", mode="rb")
@@ -38,6 +61,17 @@ class TestImageTransformer(SimpleTestCase):
         with transformer.transform(self.image, "png") as temp:
             self.assertGreater(len(temp.read()), 0)
 
+    @override_settings(ANCHOR={"IMAGE_PROCESSOR_OPTIONS": {"reducing_gap": None}})
+    def test_processor_options(self):
+        transformer = ImageTransformer({})
+        self.assertIsNone(transformer.processor.reducing_gap)
+
+    @override_settings(ANCHOR={"IMAGE_PROCESSOR_OPTIONS": {"reducing_gap": 3.0}})
+    def test_prepare(self):
+        transformer = ImageTransformer({})
+        transformer.prepare()
+        self.assertEqual(transformer.__dict__["processor"].reducing_gap, 3.0)
+
     def test_missing_transformation(self):
         transformer = ImageTransformer({"missing_transform": 10})
         with self.assertRaises(ValueError):
@@ -56,3 +90,56 @@ class TestImageTransformer(SimpleTestCase):
         )
         transformer.process(self.image, "png")
         self.assertEqual(transformer.processor.dummy_call_count, 1)
+
+    def test_process_many(self):
+        transformer = ImageTransformer({})
+        outputs = transformer.process_many(
+            self.image,
+            [
+                ({"resize_to_limit": [20, 20]}, "png"),
+                ({}, "webp"),
+                ({"resize_to_limit": {"width": 40, "height": 40}}, "png"),
+            ],
+        )
+        try:
+            sizes = [Image.open(output).size for output in outputs]
+            formats = [Image.open(output).format for output in outputs]
+        finally:
+            for output in outputs:
+                output.close()
+
+        self.assertLessEqual(max(sizes[0]), 20)
+        self.assertLessEqual(max(sizes[2]), 40)
+        self.assertGreater(max(sizes[1]), 40)
+        self.assertEqual(formats, ["PNG", "WEBP", "PNG"])
+
+    def test_process_many_decodes_once(self):
+        transformer = ImageTransformer({})
+        with patch.object(Image, "open", wraps=Image.open) as image_open:
+            outputs = transformer.process_many(
+                self.image,
+                [({"resize_to_limit": [w, w]}, "png") for w in (10, 30, 20)],
+            )
+        image_open.assert_called_once()
+        for output in outputs:
+            output.close()
+
+    def test_process_many_starts_downscales_from_larger_outputs(self):
+        transformer = ImageTransformer({}, processor_class=CopyingProcessor)
+        transformer.process_many(
+            self.image,
+            [
+                ({"resize_to_limit": [10, 10]}, "png"),
+                ({"resize_to_limit": [100, 10]}, "png"),
+                ({"resize_to_limit": [30, 30]}, "png"),
+            ],
+        )
+
+        self.assertEqual(
+            CopyingProcessor.saved,
+            [
+                ([100, 10], None),
+                ([30, 30], None),
+                ([10, 10], [30, 30]),
+            ],
+        )
@@ -1,5 +1,6 @@
-from django.test import SimpleTestCase
+from django.test import SimpleTestCase, override_settings
 from django.utils import timezone
+from freezegun import freeze_time
 
 from anchor.services.urls.file_system import FileSystemURLGenerator
 
@@ -31,3 +32,13 @@ class FileSystemURLGeneratorTestCase(SimpleTestCase):
         generator = FileSystemURLGenerator()
         url = generator.url("test", expires_in=timezone.timedelta(days=1))
         self.assertTrue(url.startswith("/anchor/file-system"))
+
+    @override_settings(ANCHOR={"SIGNED_URL_BUCKET": timezone.timedelta(minutes=5)})
+    def test_urls_are_stable_within_bucket(self):
+        generator = FileSystemURLGenerator()
+        with freeze_time("2026-01-01 12:00:01"):
+            url = generator.url("test")
+        with freeze_time("2026-01-01 12:04:59"):
+            self.assertEqual(generator.url("test"), url)
+        with freeze_time("2026-01-01 12:05:01"):
+            self.assertNotEqual(generator.url("test"), url)
@@ -0,0 +1,60 @@
+from django.test import SimpleTestCase, override_settings
+
+from anchor.models import Blob
+from anchor.services import urls
+from anchor.services.urls import (
+    BaseURLGenerator,
+    FileSystemURLGenerator,
+    get_for_backend,
+    register,
+)
+
+
+class CustomURLGenerator(BaseURLGenerator):
+    def url(self, key, **kwargs):
+        return f"https://cdn.example.com/{key}"
+
+
+class TestGetForBackend(SimpleTestCase):
+    def test_file_system_backend(self):
+        self.assertIsInstance(get_for_backend("default"), FileSystemURLGenerator)
+
+    def test_generators_are_reused(self):
+        self.assertIs(get_for_backend("default"), get_for_backend("default"))
+        self.assertIs(Blob().url_service, get_for_backend("default"))
+
+    @override_settings(
+        STORAGES={
+            "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+            "other": {"BACKEND": "django.core.files.storage.InMemoryStorage"},
+        }
+    )
+    def test_unknown_storages_use_base_generator(self):
+        self.assertIs(type(get_for_backend("other")), BaseURLGenerator)
+
+    @override_settings(
+        STORAGES={
+            "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+            "cdn": {"BACKEND": "django.core.files.storage.InMemoryStorage"},
+        }
+    )
+    def test_register(self):
+        self.addCleanup(urls._registry.pop, "django.core.files.storage.InMemoryStorage")
+        self.assertIs(type(get_for_backend("cdn")), BaseURLGenerator)
+
+        register("django.core.files.storage.InMemoryStorage", CustomURLGenerator)
+        generator = get_for_backend("cdn")
+        self.assertIsInstance(generator, CustomURLGenerator)
+        self.assertEqual(generator.url("key"), "https://cdn.example.com/key")
+
+    def test_generators_are_rebuilt_when_settings_change(self):
+        default = get_for_backend("default")
+        with override_settings(
+            STORAGES={
+                "default": {"BACKEND": "django.core.files.storage.InMemoryStorage"},
+            }
+        ):
+            self.assertIs(type(get_for_backend("default")), BaseURLGenerator)
+
+        self.assertIsNot(get_for_backend("default"), default)
+        self.assertIsInstance(get_for_backend("default"), FileSystemURLGenerator)
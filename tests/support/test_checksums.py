@@ -0,0 +1,33 @@
+import hashlib
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase
+
+from anchor.support.checksums import format_checksum, get_hasher, parse_checksum
+
+
+class TestChecksums(SimpleTestCase):
+    def test_md5_checksums_have_no_prefix(self):
+        checksum = format_checksum("md5", hashlib.md5(b"test").digest())
+        self.assertEqual(checksum, "CY9rzUYh03PK3k6DJie09g==")
+
+    def test_other_checksums_are_prefixed(self):
+        digest = hashlib.sha256(b"test").digest()
+        checksum = format_checksum("sha256", digest)
+        self.assertTrue(checksum.startswith("sha256:"))
+        self.assertEqual(parse_checksum(checksum), ("sha256", digest))
+
+    def test_unprefixed_checksums_are_md5(self):
+        self.assertEqual(
+            parse_checksum("CY9rzUYh03PK3k6DJie09g=="),
+            ("md5", hashlib.md5(b"test").digest()),
+        )
+
+    def test_get_hasher(self):
+        hasher = get_hasher("blake2b")
+        hasher.update(b"test")
+        self.assertEqual(hasher.digest(), hashlib.blake2b(b"test").digest())
+
+    def test_unsupported_algorithm(self):
+        with self.assertRaises(ImproperlyConfigured):
+            get_hasher("crc32")
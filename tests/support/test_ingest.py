@@ -0,0 +1,88 @@
+import hashlib
+from io import BytesIO
+
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase
+
+from anchor.support.ingest import IngestFile, sniff_mime_type
+
+
+class TestIngestFile(SimpleTestCase):
+    def test_reading_computes_digest_and_size(self):
+        file = IngestFile(BytesIO(b"hello world"), chunk_size=4)
+        self.assertEqual(b"".join(file.chunks()), b"hello world")
+        self.assertEqual(file.digest, hashlib.md5(b"hello world").digest())
+        self.assertEqual(file.byte_size, 11)
+
+    def test_chunks_use_configured_size(self):
+        file = IngestFile(BytesIO(b"hello world"), chunk_size=4)
+        self.assertEqual(list(file.chunks()), [b"hell", b"o wo", b"rld"])
+
+    def test_rereading_does_not_hash_twice(self):
+        file = IngestFile(BytesIO(b"hello world"), chunk_size=4)
+        file.read(6)
+        file.seek(0)
+        file.read()
+        file.finish()
+        self.assertEqual(file.digest, hashlib.md5(b"hello world").digest())
+        self.assertEqual(file.byte_size, 11)
+
+    def test_finish_reads_skipped_bytes(self):
+        file = IngestFile(BytesIO(b"hello world"), chunk_size=4)
+        file.read(2)
+        file.seek(8)
+        file.finish()
+        self.assertEqual(file.digest, hashlib.md5(b"hello world").digest())
+        self.assertEqual(file.byte_size, 11)
+
+    def test_finish_accepts_closed_files_read_to_the_end(self):
+        file = IngestFile(BytesIO(b"hello world"), chunk_size=4)
+        b"".join(file.chunks())
+        file.close()
+        file.finish()
+        self.assertEqual(file.byte_size, 11)
+
+    def test_finish_rejects_closed_files_read_partially(self):
+        file = IngestFile(BytesIO(b"hello world"), chunk_size=4)
+        file.read(4)
+        file.close()
+        with self.assertRaises(ValueError):
+            file.finish()
+
+    def test_content_type_is_forwarded(self):
+        source = SimpleUploadedFile("a.png", b"png", content_type="image/png")
+        self.assertEqual(IngestFile(source, chunk_size=4).content_type, "image/png")
+        self.assertFalse(hasattr(IngestFile(BytesIO(), chunk_size=4), "content_type"))
+
+    def test_reading_starts_from_the_beginning(self):
+        buffer = BytesIO(b"hello world")
+        buffer.seek(5)
+        file = IngestFile(buffer, chunk_size=4)
+        file.finish()
+        self.assertEqual(file.byte_size, 11)
+
+    def test_text_files_are_hashed_as_utf8(self):
+        file = IngestFile(ContentFile("héllo"), chunk_size=4)
+        file.finish()
+        self.assertEqual(file.digest, hashlib.md5("héllo".encode("utf-8")).digest())
+        self.assertEqual(file.byte_size, 6)
+
+    def test_head_is_kept_for_sniffing(self):
+        file = IngestFile(File(open("tests/fixtures/garlic.png", "rb")), chunk_size=4)
+        with file:
+            file.finish()
+        self.assertEqual(file.sniffed_mime_type, "image/png")
+
+
+class TestSniffMimeType(SimpleTestCase):
+    def test_known_signatures(self):
+        self.assertEqual(sniff_mime_type(b"\x89PNG\r\n\x1a\n...."), "image/png")
+        self.assertEqual(sniff_mime_type(b"\xff\xd8\xff\xe0"), "image/jpeg")
+        self.assertEqual(sniff_mime_type(b"RIFF\x00\x00\x00\x00WEBPVP8 "), "image/webp")
+        self.assertEqual(sniff_mime_type(b"%PDF-1.7"), "application/pdf")
+
+    def test_unknown_signature(self):
+        self.assertIsNone(sniff_mime_type(b"test"))
+        self.assertIsNone(sniff_mime_type(b""))
@@ -0,0 +1,50 @@
+from django.test import SimpleTestCase
+
+from anchor.support.lru import LRUCache
+
+
+class TestLRUCache(SimpleTestCase):
+    def test_get_and_set(self):
+        cache = LRUCache()
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.get("a", 1), 1)
+
+        cache.set("a", 2)
+        self.assertEqual(cache.get("a"), 2)
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+
+    def test_get_or_set(self):
+        cache = LRUCache()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return None
+
+        self.assertIsNone(cache.get_or_set("a", compute))
+        self.assertIsNone(cache.get_or_set("a", compute))
+        self.assertEqual(len(calls), 1)
+
+    def test_clear(self):
+        cache = LRUCache()
+        cache.set("a", 1)
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+
+    def test_delete(self):
+        cache = LRUCache()
+        cache.set("a", 1)
+        cache.delete("a")
+        cache.delete("missing")
+        self.assertIsNone(cache.get("a"))
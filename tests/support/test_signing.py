@@ -1,8 +1,17 @@
-from django.test import SimpleTestCase
+from unittest.mock import patch
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signing import BadSignature, Signer
+from django.test import SimpleTestCase, override_settings
 from django.utils import timezone
 from freezegun import freeze_time
 
-from anchor.support.signing import AnchorSigner, ExpiredSignature, InvalidPurpose
+from anchor.support.signing import (
+    AnchorSigner,
+    ExpiredSignature,
+    InvalidPurpose,
+    get_signer,
+)
 
 
 class TestAnchorSigner(SimpleTestCase):
@@ -40,3 +49,187 @@ class TestAnchorSigner(SimpleTestCase):
             self.assertRaises(ExpiredSignature),
         ):
             self.signer.unsign(signed)
+
+    def test_signature_matches_django_signer(self):
+        for key in [self.signer.key, "another-key"]:
+            self.assertEqual(
+                self.signer.signature("a value", key),
+                Signer.signature(self.signer, "a value", key),
+            )
+
+    def test_sign_many(self):
+        values = ["a", {"b": 1}, 2]
+        signed = self.signer.sign_many(values, purpose="test")
+        self.assertEqual(signed, [self.signer.sign(v, purpose="test") for v in values])
+        self.assertEqual(
+            [self.signer.unsign(s, purpose="test") for s in signed], values
+        )
+
+    def test_unsign_with_fallback_key(self):
+        old_signer = AnchorSigner(key="old-key")
+        signer = AnchorSigner(key="new-key", fallback_keys=["old-key"])
+        self.assertEqual(signer.unsign(old_signer.sign("a value")), "a value")
+
+
+class TestGetSigner(SimpleTestCase):
+    def test_returns_shared_signer(self):
+        self.assertIs(get_signer(), get_signer())
+
+    def test_signer_depends_on_salt(self):
+        self.assertIsNot(get_signer(), get_signer(salt="other"))
+        self.assertEqual(get_signer(salt="other").salt, "other")
+
+    def test_signer_changes_with_secret_key(self):
+        signer = get_signer()
+        signed = signer.sign("a value")
+
+        with override_settings(SECRET_KEY="rotated", SECRET_KEY_FALLBACKS=[]):
+            self.assertIsNot(get_signer(), signer)
+            with self.assertRaises(BadSignature):
+                get_signer().unsign(signed)
+
+        with override_settings(SECRET_KEY="rotated", SECRET_KEY_FALLBACKS=[signer.key]):
+            self.assertEqual(get_signer().unsign(signed), "a value")
+
+
+class TestCompactFormat(SimpleTestCase):
+    def setUp(self):
+        self.signer = AnchorSigner(format="compact")
+
+    def test_signing_and_unsigning(self):
+        values_to_test = [
+            "a simple string",
+            "",
+            1234,
+            12.34,
+            {"key": "value"},
+            [1, 2, "3", "hello"],
+        ]
+
+        for value in values_to_test:
+            signed = self.signer.sign(value)
+            self.assertNotIn(":", signed)
+            self.assertEqual(self.signer.unsign(signed), value)
+
+    def test_signing_and_unsigning_with_purpose(self):
+        for purpose in ["variation", "file_system", "custom"]:
+            signed = self.signer.sign("a simple string", purpose=purpose)
+            self.assertEqual(
+                self.signer.unsign(signed, purpose=purpose), "a simple string"
+            )
+
+            with self.assertRaises(InvalidPurpose):
+                self.signer.unsign(signed, purpose="test2")
+
+    def test_signing_and_unsigning_with_expires_in(self):
+        signed = self.signer.sign(
+            "a simple string", expires_in=timezone.timedelta(days=1)
+        )
+        self.assertEqual(self.signer.unsign(signed), "a simple string")
+
+        with (
+            freeze_time(timezone.now() + timezone.timedelta(days=2)),
+            self.assertRaises(ExpiredSignature),
+        ):
+            self.signer.unsign(signed)
+
+    def test_compact_tokens_are_shorter(self):
+        value = {"format": "webp", "resize_to_limit": [300, 300]}
+        legacy = AnchorSigner(format="json").sign(value, purpose="variation")
+        compact = self.signer.sign(value, purpose="variation")
+        self.assertLess(len(compact), len(legacy))
+
+    def test_legacy_tokens_are_accepted(self):
+        signed = AnchorSigner(format="json").sign("a value", purpose="variation")
+        self.assertEqual(self.signer.unsign(signed, purpose="variation"), "a value")
+
+    def test_format_defaults_to_setting(self):
+        signer = AnchorSigner()
+        self.assertIn(":", signer.sign("a value"))
+
+        with override_settings(ANCHOR={"SIGNING_FORMAT": "compact"}):
+            self.assertNotIn(":", signer.sign("a value"))
+
+    def test_tampered_tokens_are_rejected(self):
+        signed = self.signer.sign("a value")
+        tampered = signed[:5] + ("A" if signed[5] != "A" else "B") + signed[6:]
+        for token in [tampered, signed[:-2], "", "not base64!"]:
+            with self.assertRaises(BadSignature):
+                self.signer.unsign(token)
+
+    def test_unsign_with_fallback_key(self):
+        old_signer = AnchorSigner(key="old-key", format="compact")
+        signer = AnchorSigner(key="new-key", fallback_keys=["old-key"])
+        self.assertEqual(signer.unsign(old_signer.sign("a value")), "a value")
+
+    def test_truncated_signature(self):
+        full = self.signer.sign("a value")
+        with override_settings(ANCHOR={"COMPACT_SIGNATURE_SIZE": 16}):
+            truncated = self.signer.sign("a value")
+            self.assertLess(len(truncated), len(full))
+            self.assertEqual(self.signer.unsign(truncated), "a value")
+            self.assertEqual(self.signer.unsign(full), "a value")
+
+        # Signatures shorter than the configured size are rejected
+        with self.assertRaises(BadSignature):
+            self.signer.unsign(truncated)
+
+    def test_signature_size_must_not_be_too_small(self):
+        with (
+            override_settings(ANCHOR={"COMPACT_SIGNATURE_SIZE": 8}),
+            self.assertRaises(ImproperlyConfigured),
+        ):
+            self.signer.sign("a value")
+
+
+@override_settings(ANCHOR={"SIGNED_URL_BUCKET": timezone.timedelta(minutes=5)})
+class TestSignedURLBucket(SimpleTestCase):
+    def setUp(self):
+        self.signer = AnchorSigner()
+
+    def test_expiration_is_rounded_up(self):
+        with freeze_time("2026-01-01 12:00:01"):
+            signed = self.signer.sign("a value", expires_in=timezone.timedelta(hours=1))
+
+        with freeze_time("2026-01-01 13:04:59"):
+            self.assertEqual(self.signer.unsign(signed), "a value")
+
+        with (
+            freeze_time("2026-01-01 13:05:01"),
+            self.assertRaises(ExpiredSignature),
+        ):
+            self.signer.unsign(signed)
+
+    def test_tokens_are_stable_within_bucket(self):
+        expires_in = timezone.timedelta(hours=1)
+        with freeze_time("2026-01-01 12:00:01"):
+            signed = self.signer.sign({"a": 1}, expires_in=expires_in)
+        with freeze_time("2026-01-01 12:04:59"):
+            self.assertEqual(self.signer.sign({"a": 1}, expires_in=expires_in), signed)
+            self.assertNotEqual(
+                self.signer.sign({"a": 1}, expires_in=expires_in, purpose="p"), signed
+            )
+        with freeze_time("2026-01-01 12:05:01"):
+            self.assertNotEqual(
+                self.signer.sign({"a": 1}, expires_in=expires_in), signed
+            )
+
+    def test_tokens_are_memoized(self):
+        expires_in = timezone.timedelta(hours=1)
+        with (
+            freeze_time("2026-01-01 12:00:01"),
+            patch.object(self.signer, "_sign", wraps=self.signer._sign) as sign,
+        ):
+            self.signer.sign("a value", expires_in=expires_in)
+            self.signer.sign("a value", expires_in=expires_in)
+
+        sign.assert_called_once()
+
+    def test_explicit_expiration_is_not_rounded(self):
+        expires_at = timezone.now() + timezone.timedelta(minutes=1)
+        signed = self.signer.sign("a value", expires_at=expires_at)
+        with (
+            freeze_time(expires_at + timezone.timedelta(seconds=1)),
+            self.assertRaises(ExpiredSignature),
+        ):
+            self.signer.unsign(signed)
@@ -0,0 +1,48 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.files.storage import FileSystemStorage
+from django.test import SimpleTestCase, override_settings
+
+from anchor.models import Blob
+from anchor.services.urls.base import BaseURLGenerator
+from anchor.support.storage import clear_storages, get_storage
+
+
+class TestGetStorage(SimpleTestCase):
+    def setUp(self):
+        clear_storages()
+
+    def test_storage_is_built_from_settings(self):
+        self.assertIsInstance(get_storage("default"), FileSystemStorage)
+
+    def test_storage_is_reused(self):
+        self.assertIs(get_storage("default"), get_storage("default"))
+        self.assertIs(Blob().storage, get_storage("default"))
+        self.assertIs(BaseURLGenerator("default").storage, get_storage("default"))
+
+    def test_storage_is_reused_across_threads(self):
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            instances = set(
+                map(id, executor.map(lambda _: get_storage("default"), range(32)))
+            )
+        self.assertEqual(len(instances), 1)
+
+    def test_unknown_backends_raise(self):
+        with self.assertRaises(KeyError):
+            get_storage("unknown")
+
+    def test_storages_are_rebuilt_when_settings_change(self):
+        default = get_storage("default")
+        with override_settings(
+            STORAGES={
+                "default": {
+                    "BACKEND": "django.core.files.storage.FileSystemStorage",
+                    "OPTIONS": {"location": "tmp/other"},
+                },
+            }
+        ):
+            other = get_storage("default")
+            self.assertIsNot(other, default)
+            self.assertTrue(other.location.endswith("other"))
+
+        self.assertIsNot(get_storage("default"), other)
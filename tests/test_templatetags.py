@@ -0,0 +1,52 @@
+import os
+
+from django.conf import settings
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+
+from anchor.models import Blob
+from anchor.models.variation import Variation
+from tests.dummy.models import Dummy
+
+GARLIC_PNG = os.path.join(settings.BASE_DIR, "fixtures", "garlic.png")
+
+
+class TestRepresentationURL(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.dummy = Dummy.objects.create(name="Garlic")
+        cls.dummy.cover = Blob.objects.from_path(GARLIC_PNG)
+        cls.dummy.poster = Blob.objects.from_path(GARLIC_PNG)
+
+    def render(self, template, **context):
+        return Template("{% load anchor %}" + template).render(Context(context))
+
+    def test_keyword_transformations(self):
+        url = self.render(
+            "{% representation_url cover resize_to_fit='20x20' %}",
+            cover=self.dummy.cover,
+        )
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+    def test_field_preset(self):
+        url = self.render(
+            '{% representation_url poster "thumb" %}', poster=self.dummy.poster
+        )
+        digest = self.dummy._meta.get_field("poster").variants["thumb"]
+        self.assertIn(f"/{digest}/", url)
+
+        response = self.client.get(url, follow=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get("Content-Type"), "image/webp")
+
+    @override_settings(ANCHOR={"VARIANTS": {"tiny": {"resize_to_fit": [8, 8]}}})
+    def test_global_preset(self):
+        url = self.render(
+            '{% representation_url blob "tiny" %}', blob=self.dummy.cover.blob
+        )
+        digest = Variation({"resize_to_fit": [8, 8]}).digest
+        self.assertIn(f"/{digest}/", url)
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+    def test_attachment_presets(self):
+        self.assertEqual(list(self.dummy.poster.presets), ["thumb"])
@@ -2,7 +2,7 @@ from unittest import skipUnless
 
 from django.conf import settings
 from django.core.files.base import ContentFile
-from django.test import TestCase, tag
+from django.test import TestCase, override_settings, tag
 from django.urls import reverse
 
 from anchor.models import Blob
@@ -25,6 +25,50 @@ class TestBlobRedirectView(TestCase):
         )
         self.assertEqual(response.status_code, 302)
 
+    @override_settings(ANCHOR={"SERVE_MODE": "proxy", "SERVE_CHUNK_SIZE": 2})
+    def test_proxy(self):
+        url = reverse("anchor:blob", kwargs={"signed_id": self.blob.signed_id})
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.streaming_content), [b"te", b"st"])
+        self.assertEqual(response["Content-Type"], "text/plain")
+        self.assertEqual(response["Content-Length"], "4")
+        self.assertEqual(response["ETag"], f'"{self.blob.checksum}"')
+        self.assertEqual(response["Cache-Control"], "private, max-age=3600")
+        self.assertEqual(response["X-Content-Type-Options"], "nosniff")
+
+        response = self.client.get(url, headers={"If-None-Match": response["ETag"]})
+        self.assertEqual(response.status_code, 304)
+
+    @override_settings(ANCHOR={"SERVE_MODE": "proxy"})
+    def test_proxy_serves_only_images_inline(self):
+        for name, disposition in [
+            ("a.png", "inline"),
+            ("a.html", "attachment"),
+            ("a.svg", "attachment"),
+            ("a.txt", "attachment"),
+        ]:
+            blob = Blob.objects.create(file=ContentFile(b"test", name=name))
+            response = self.client.get(
+                reverse("anchor:blob", kwargs={"signed_id": blob.signed_id})
+            )
+            with self.subTest(name):
+                self.assertEqual(
+                    response["Content-Disposition"], f'{disposition}; filename="{name}"'
+                )
+                self.assertEqual(response["X-Content-Type-Options"], "nosniff")
+            response.close()
+
+    @override_settings(ANCHOR={"SERVE_MODE": "proxy"})
+    def test_proxy_missing_file(self):
+        blob = Blob.objects.create(file=ContentFile("test", name="test.txt"))
+        blob.storage.delete(blob.key)
+        response = self.client.get(
+            reverse("anchor:blob", kwargs={"signed_id": blob.signed_id})
+        )
+        self.assertEqual(response.status_code, 404)
+
     @skipUnless("r2-dev" in settings.STORAGES, "R2 is not configured")
     @tag("uses-network")
     def test_get_with_r2_blob(self):
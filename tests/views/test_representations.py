@@ -1,7 +1,12 @@
-from django.test import TestCase
+from unittest.mock import PropertyMock, patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 from django.urls import reverse
+from django.utils import timezone
 
-from anchor.models import Blob
+from anchor.models import Blob, Variant
+from anchor.services.locks import LockTimeout
 
 
 class TestRepresentationView(TestCase):
@@ -35,3 +40,96 @@ class TestRepresentationView(TestCase):
         )
         response = self.client.get(url)
         self.assertEqual(response.status_code, 404)
+
+    def test_lock_timeout(self):
+        variant = self.blob.representation({"format": "png"})
+        url = reverse(
+            "anchor:representation",
+            kwargs={
+                "signed_blob_id": self.blob.signed_id,
+                "variation_key": variant.variation.key,
+            },
+        )
+        with patch.object(
+            Variant, "processed", side_effect=LockTimeout, new_callable=PropertyMock
+        ):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "1")
+
+    @override_settings(ANCHOR={"IMAGE_PROCESSOR_OPTIONS": {"max_pixels": 10}})
+    def test_transformation_error(self):
+        variant = self.blob.representation({"format": "webp"})
+        url = reverse(
+            "anchor:representation",
+            kwargs={
+                "signed_blob_id": self.blob.signed_id,
+                "variation_key": variant.variation.key,
+            },
+        )
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 422)
+        self.assertFalse(variant.is_processed)
+
+    @override_settings(
+        ANCHOR={
+            "IMAGE_PROCESSOR_OPTIONS": {"max_pixels": 10},
+            "VARIANT_FAILURE_CACHE": "default",
+            "VARIANT_FAILURE_BACKOFF": timezone.timedelta(seconds=30),
+        }
+    )
+    def test_recent_failure(self):
+        cache.clear()
+        variant = self.blob.representation({"format": "png", "rotate": 90})
+        url = reverse(
+            "anchor:representation",
+            kwargs={
+                "signed_blob_id": self.blob.signed_id,
+                "variation_key": variant.variation.key,
+            },
+        )
+        self.assertNotIn("Retry-After", self.client.get(url))
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 422)
+        self.assertIn(response["Retry-After"], ("30", "31"))
+
+    @override_settings(ANCHOR={"SERVE_MODE": "proxy"})
+    def test_proxy(self):
+        variant = self.blob.representation({"format": "webp", "resize_to_fit": [5, 5]})
+        url = reverse(
+            "anchor:representation",
+            kwargs={
+                "signed_blob_id": self.blob.signed_id,
+                "variation_key": variant.variation.key,
+            },
+        )
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "image/webp")
+        content = b"".join(response.streaming_content)
+        self.assertEqual(content[8:12], b"WEBP")
+        self.assertEqual(response["Content-Length"], str(len(content)))
+        self.assertIn("max-age=3600", response["Cache-Control"])
+
+        # Cached copies are revalidated without processing the variant
+        with patch.object(
+            Variant, "processed", side_effect=AssertionError, new_callable=PropertyMock
+        ):
+            etag = response["ETag"]
+            response = self.client.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+
+        # Other blobs with the same variation are not cached copies of this one
+        with open("tests/fixtures/garlic.png", "rb") as f:
+            other = Blob.objects.create(file=f)
+        url = reverse(
+            "anchor:representation",
+            kwargs={
+                "signed_blob_id": other.signed_id,
+                "variation_key": variant.variation.key,
+            },
+        )
+        response = self.client.get(url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        response.close()